@@ -0,0 +1,147 @@
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+
+class ArtifactStore:
+    """Process-wide store of generated texts (analyses, guides, strategies), each held once.
+
+    put() returns a handle (the SHA-256 of the text) and takes a reference on it;
+    release() drops the reference. A text no session references any more is kept
+    in an LRU, so the next session asking for the same guide still shares it,
+    until the unreferenced texts exceed `max_unreferenced_bytes`.
+    """
+
+    def __init__(self, max_unreferenced_bytes=32 * 1024 * 1024):
+        self.max_unreferenced_bytes = max_unreferenced_bytes
+        self._entries = {}  # handle -> [text, refcount, size]
+        self._unreferenced = OrderedDict()  # handle -> size, least recently released first
+        self._unreferenced_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"puts": 0, "dedup_hits": 0, "evictions": 0, "sessions": 0}
+
+    @staticmethod
+    def make_handle(text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def put(self, text):
+        handle = self.make_handle(text)
+        with self._lock:
+            self._stats["puts"] += 1
+            entry = self._entries.get(handle)
+            if entry is None:
+                self._entries[handle] = [text, 1, sys.getsizeof(text)]
+            else:
+                self._stats["dedup_hits"] += 1
+                if entry[1] == 0:
+                    self._unreferenced_bytes -= self._unreferenced.pop(handle)
+                entry[1] += 1
+        return handle
+
+    def get(self, handle):
+        with self._lock:
+            entry = self._entries.get(handle)
+            return None if entry is None else entry[0]
+
+    def size(self, handle):
+        with self._lock:
+            entry = self._entries.get(handle)
+            return 0 if entry is None else entry[2]
+
+    def release(self, handle):
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is None or entry[1] == 0:
+                return
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._unreferenced[handle] = entry[2]
+                self._unreferenced_bytes += entry[2]
+                while self._unreferenced_bytes > self.max_unreferenced_bytes:
+                    evicted, size = self._unreferenced.popitem(last=False)
+                    del self._entries[evicted]
+                    self._unreferenced_bytes -= size
+                    self._stats["evictions"] += 1
+
+    def session_opened(self):
+        with self._lock:
+            self._stats["sessions"] += 1
+
+    def session_closed(self):
+        with self._lock:
+            self._stats["sessions"] -= 1
+
+    def stats(self):
+        # bytes: what the store holds; referenced_bytes: what sessions would hold with a copy each
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = sum(entry[2] for entry in self._entries.values())
+            stats["referenced_bytes"] = sum(entry[2] * entry[1] for entry in self._entries.values())
+            stats["unreferenced_bytes"] = self._unreferenced_bytes
+        stats["saved_bytes"] = max(0, stats["referenced_bytes"] - (stats["bytes"] - stats["unreferenced_bytes"]))
+        return stats
+
+
+def _artifact_property(field):
+    slot = "_" + field
+
+    def fget(self):
+        handle = getattr(self, slot)
+        return None if handle is None else self._store.get(handle)
+
+    def fset(self, text):
+        self._replace(slot, text)
+
+    return property(fget, fset, doc=f"The session's {field.replace('_', ' ')} (a shared text), or None.")
+
+
+class SessionArtifacts:
+    """One session's generated texts, kept as handles into an ArtifactStore.
+
+    Read and assign them like attributes (artifacts.cv_analysis = text); assigning
+    None or another text releases the previous one. All handles are released when
+    Streamlit drops the expired session's state and this object is collected.
+    """
+
+    FIELDS = ("cv_text", "cv_analysis", "career_suggestions", "learning_materials", "enhancement_strategy", "test_results")
+    __slots__ = ("_store",) + tuple("_" + field for field in FIELDS)
+
+    def __init__(self, store):
+        self._store = store
+        for field in self.FIELDS:
+            setattr(self, "_" + field, None)
+        store.session_opened()
+
+    def _replace(self, slot, text):
+        old = getattr(self, slot)
+        setattr(self, slot, None if text is None else self._store.put(text))
+        if old is not None:
+            self._store.release(old)
+
+    def handles(self):
+        return {field: getattr(self, "_" + field) for field in self.FIELDS if getattr(self, "_" + field) is not None}
+
+    def memory_bytes(self):
+        # Bytes of the texts this session references (each also counted by any other session sharing it)
+        return sum(self._store.size(handle) for handle in self.handles().values())
+
+    def clear(self):
+        for field in self.FIELDS:
+            self._replace("_" + field, None)
+
+    def __del__(self):
+        try:
+            self.clear()
+            self._store.session_closed()
+        except Exception:  # Interpreter shutdown
+            pass
+
+    def __repr__(self):
+        return f"SessionArtifacts({', '.join(f'{field}={handle[:12]}' for field, handle in self.handles().items())})"
+
+
+for _field in SessionArtifacts.FIELDS:
+    setattr(SessionArtifacts, _field, _artifact_property(_field))
+del _field
@@ -0,0 +1,257 @@
+# Runs a directory of CVs through the career advisor pipeline (advisor.core), e.g. for a whole cohort:
+#   GROQ_API_KEY=... python -m advisor.batch cvs/ --output results.jsonl --workers 8
+# Each document becomes one JSON line, written as soon as it is done. Re-running with the same output file
+# skips documents already processed successfully (matched by content hash), so an interrupted run resumes.
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from advisor.cv import DOCX_MIME, PDF_MIME, document_digest
+
+FILE_TYPES = {".pdf": PDF_MIME, ".docx": DOCX_MIME}
+STAGES = ["extract", "analyze", "skills", "materials", "test"]
+
+
+def find_documents(directory):
+    paths = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if os.path.splitext(name)[1].lower() in FILE_TYPES:
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def completed_digests(output_path):
+    # Digests of documents that already have a successful result line; a truncated last line is ignored
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("status") == "ok":
+                done.add(record.get("digest"))
+    return done
+
+
+class _Timer:
+    def __init__(self, timings, stage):
+        self.timings = timings
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.timings[self.stage] = round(time.perf_counter() - self.started, 4)
+
+
+def process_document(advisor, path, file_bytes, experience_level="Student", skills_per_cv=1, with_tests=True):
+    """Run one CV through the pipeline; returns the JSON-serialisable result record."""
+    timings = {}
+    record = {"path": path, "digest": document_digest(file_bytes), "experience_level": experience_level, "timings": timings}
+    try:
+        with _Timer(timings, "extract"):
+            compaction = advisor.ingest_cv(file_bytes, FILE_TYPES[os.path.splitext(path)[1].lower()])
+        if not compaction["text"].strip():
+            raise ValueError("No text could be extracted from the document.")
+        # With a profile store, an updated version of an already processed CV only re-analyzes its changed sections
+        plan = advisor.plan_cv_analysis(compaction) if advisor.profile_store is not None else None
+        with _Timer(timings, "analyze"):
+            if plan is not None:
+                analysis = advisor.analyze_cv_incremental(plan, compaction["text"])
+            else:
+                analysis = advisor.analyze_cv(compaction["text"])
+        with _Timer(timings, "skills"):
+            if plan is not None:
+                skill_text = advisor.extract_skills_incremental(plan, analysis, compaction["text"])
+                record["profile_id"] = advisor.save_cv_profile(plan, record["digest"], analysis, skill_text)
+                record["analysis_mode"] = plan["mode"]
+            else:
+                skill_text = advisor.extract_skills(analysis, compaction["text"])
+            skills = [s.strip() for s in skill_text.split(",") if s.strip()]
+        record.update({
+            "compaction": {key: compaction[key] for key in ("original_tokens", "compact_tokens", "compression_ratio")},
+            "cv_analysis": analysis,
+            "skills": skills,
+            "enhancement": [],
+        })
+        with _Timer(timings, "materials"):
+            for skill in skills[:skills_per_cv]:
+                record["enhancement"].append({"skill": skill, "learning_materials": advisor.learning_materials(skill, experience_level)})
+        if with_tests and advisor.question_bank is not None:
+            with _Timer(timings, "test"):
+                for item in record["enhancement"]:
+                    item["test"] = [
+                        {key: question[key] for key in ("question", "options", "answer")}
+                        for question in advisor.sample_test(item["skill"], experience_level)
+                    ]
+        record["status"] = "ok"
+    except Exception as e:
+        record.update({"status": "error", "error": f"{type(e).__name__}: {e}"})
+    return record
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+
+def run_batch(advisor, paths, output_path, workers=4, experience_level="Student", skills_per_cv=1, with_tests=True,
+              progress=None):
+    """Process `paths` with at most `workers` documents in flight, appending results to `output_path`.
+
+    Returns a summary dict with counts, throughput and per-stage timing.
+    """
+    done = completed_digests(output_path)
+    summary = {"documents": len(paths), "ok": 0, "errors": 0, "skipped": 0}
+    stage_times = {stage: [] for stage in STAGES}
+    started = time.perf_counter()
+
+    def job(path):
+        try:
+            with open(path, "rb") as f:
+                file_bytes = f.read()
+        except Exception as e:
+            # A missing or unreadable file fails on its own, like a document whose extraction fails
+            return {"path": path, "digest": None, "experience_level": experience_level, "timings": {},
+                    "status": "error", "error": f"{type(e).__name__}: {e}"}
+        if document_digest(file_bytes) in done:
+            return None
+        return process_document(advisor, path, file_bytes, experience_level, skills_per_cv, with_tests)
+
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+
+        def finish(future):
+            # Runs on the submitting thread only, so the output file needs no lock
+            record = future.result()
+            if record is None:
+                summary["skipped"] += 1
+                return
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            summary["ok" if record["status"] == "ok" else "errors"] += 1
+            for stage, seconds in record["timings"].items():
+                stage_times[stage].append(seconds)
+            if record["status"] == "ok":
+                done.add(record["digest"])  # Identical files later in the run are skipped too
+            if progress is not None:
+                progress(summary, time.perf_counter() - started)
+
+        # Only `workers * 2` documents are queued at a time, so memory stays flat for any directory size
+        for path in paths:
+            pending.add(executor.submit(job, path))
+            if len(pending) >= workers * 2:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    finish(future)
+        for future in pending:
+            finish(future)
+
+    elapsed = time.perf_counter() - started
+    processed = summary["ok"] + summary["errors"]
+    summary["elapsed_seconds"] = round(elapsed, 2)
+    summary["docs_per_second"] = round(processed / elapsed, 3) if elapsed > 0 else 0.0
+    summary["stages"] = {
+        stage: {
+            "count": len(times),
+            "mean_seconds": round(sum(times) / len(times), 3),
+            "p95_seconds": round(_percentile(times, 0.95), 3),
+            "total_seconds": round(sum(times), 2),
+        }
+        for stage, times in stage_times.items() if times
+    }
+    return summary
+
+
+def main(argv=None):
+    from advisor.core import CareerAdvisor
+    from advisor.cv import IsolatedExtractor
+    from advisor.llm_cache import CompletionCache
+    from advisor.metrics import metrics
+    from advisor.profile_store import ProfileStore
+    from advisor.question_bank import QuestionBank
+    from advisor.quiz import parse_stats
+    from advisor.resources import create_groq_client
+    from advisor.routing import TIERS, ModelRouter
+    from advisor.scheduler import RequestScheduler
+
+    parser = argparse.ArgumentParser(description="Process a directory of PDF/DOCX CVs into JSONL results.")
+    parser.add_argument("input_dir")
+    parser.add_argument("--output", default="results.jsonl", help="JSONL file; existing successful results are skipped")
+    parser.add_argument("--workers", type=int, default=4, help="Documents processed concurrently")
+    parser.add_argument("--experience-level", default="Student")
+    parser.add_argument("--skills-per-cv", type=int, default=1, help="Skills to prepare learning materials (and tests) for")
+    parser.add_argument("--no-tests", action="store_true", help="Skip test sampling")
+    parser.add_argument("--metrics-file", help="Write Prometheus text metrics here when the run ends")
+    parser.add_argument("--cache", default=os.environ.get("LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite")))
+    parser.add_argument("--question-bank", default=os.environ.get("QUESTION_BANK_PATH", os.path.join(".cache", "question_bank.sqlite")))
+    parser.add_argument("--profiles", help="Profile store (SQLite); updated CVs then only re-analyze their changed sections")
+    args = parser.parse_args(argv)
+
+    paths = find_documents(args.input_dir)
+    if not paths:
+        parser.error(f"no PDF or DOCX files found in {args.input_dir}")
+
+    client = create_groq_client(os.environ["GROQ_API_KEY"], max_connections=max(args.workers, 4), max_retries=0)
+    scheduler = RequestScheduler(
+        requests_per_minute=int(os.environ.get("GROQ_REQUESTS_PER_MINUTE", "60")),
+        tokens_per_minute=int(os.environ.get("GROQ_TOKENS_PER_MINUTE", "60000")),
+        max_retries=int(os.environ.get("GROQ_SCHEDULER_RETRIES", "3")),
+    )
+    cache = CompletionCache(path=args.cache)
+    router = ModelRouter(client, cache, scheduler, tiers={
+        "fast": os.environ.get("GROQ_FAST_MODEL", TIERS["fast"]),
+        "large": os.environ.get("GROQ_LARGE_MODEL", TIERS["large"]),
+    })
+    question_bank = QuestionBank(args.question_bank)
+    profile_store = ProfileStore(args.profiles) if args.profiles else None
+    extractor = IsolatedExtractor(max_workers=args.workers)
+    metrics.register_collector("llm_cache", cache.stats)
+    metrics.register_collector("scheduler", scheduler.stats)
+    metrics.register_collector("test_parse", parse_stats.snapshot)
+    advisor = CareerAdvisor(
+        router,
+        question_bank=question_bank,
+        extractor=extractor,
+        test_format=os.environ.get("TEST_OUTPUT_FORMAT", "json"),
+        cv_token_budget=int(os.environ.get("CV_PROMPT_TOKEN_BUDGET", "1500")),
+        profile_store=profile_store,
+    )
+
+    def progress(summary, elapsed):
+        processed = summary["ok"] + summary["errors"]
+        print(
+            f"\r{processed + summary['skipped']}/{summary['documents']} "
+            f"({summary['errors']} errors, {summary['skipped']} skipped) {processed / elapsed:.2f} docs/sec",
+            end="", file=sys.stderr, flush=True,
+        )
+
+    try:
+        summary = run_batch(
+            advisor, paths, args.output, workers=args.workers, experience_level=args.experience_level,
+            skills_per_cv=args.skills_per_cv, with_tests=not args.no_tests, progress=progress,
+        )
+    finally:
+        if args.metrics_file:
+            metrics.write_file(args.metrics_file)
+        cache.close()
+        question_bank.close()
+        extractor.close()
+        if profile_store is not None:
+            profile_store.close()
+        client.close()
+    print(file=sys.stderr)
+    summary["routes"] = router.stats()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import re
+
+from advisor.cv import DEFAULT_MAX_CHARS, extract_cv_text
+from advisor.cv_compact import compact_cv, compact_sections, count_tokens
+from advisor.metrics import metrics
+from advisor.prompts import (
+    career_paths_prompt,
+    cv_analysis_prompt,
+    cv_update_prompt,
+    enhancement_strategy_prompt,
+    learning_guide_prompt,
+    skill_extraction_prompt,
+    test_prompt,
+)
+from advisor.profile_store import diff_sections
+from advisor.quiz import generate_structured_test, parse_test_content
+from advisor.scheduler import INTERACTIVE
+from advisor.skill_index import match_skills
+
+_SKILL_PREFIX_RE = re.compile(
+    r'^(Skills:|Suggested skills:|Key technical skills:|Technical skills to enhance:)\s*', re.IGNORECASE
+)
+
+
+def _prompt_tokens(messages):
+    return sum(count_tokens(message["content"]) for message in messages)
+
+
+def score_test(user_answers, correct_answers):
+    """Score selected options ("A) ...") against the answer letters; returns score, total and percentage."""
+    total = len(correct_answers)
+    score = sum(
+        1 for answer, correct in zip(user_answers, correct_answers)
+        if answer and answer[0] == correct
+    )
+    return {"score": score, "total": total, "percentage": (score / total) * 100 if total > 0 else 0}
+
+
+class CareerAdvisor:
+    """Every step of the career advisor pipeline, free of Streamlit.
+
+    The Streamlit page and the batch CLI (advisor.batch) are both thin clients of
+    this class. Methods that produce long text take stream=True to return an
+    iterator of chunks instead of the full text. Nothing here touches st.*, so
+    every method is safe to call from worker threads.
+    """
+
+    def __init__(self, router, question_bank=None, extractor=None, test_format="json",
+                 question_batch=10, question_low_water=10, cv_max_chars=DEFAULT_MAX_CHARS, cv_token_budget=1500,
+                 profile_store=None):
+        self.router = router
+        self.question_bank = question_bank
+        self.profile_store = profile_store  # A ProfileStore, or None to analyze every CV from scratch
+        self.extractor = extractor  # An IsolatedExtractor, or None to parse in the calling thread
+        self.test_format = test_format
+        self.question_batch = question_batch
+        self.question_low_water = question_low_water
+        self.cv_max_chars = cv_max_chars
+        self.cv_token_budget = cv_token_budget
+
+    def _generate(self, route, messages, temperature, max_tokens, stream=False, priority=INTERACTIVE):
+        if stream:
+            return self.router.stream(route, messages, temperature, max_tokens, priority=priority)
+        return self.router.complete(route, messages, temperature, max_tokens, priority=priority)
+
+    # --- CV ---
+    def ingest_cv(self, file_bytes, file_type):
+        """Extract and compact a PDF/DOCX CV; returns the advisor.cv_compact.compact_cv dict."""
+        with metrics.span("cv_extract", bytes=len(file_bytes)):
+            if self.extractor is not None:
+                text = self.extractor.extract(file_bytes, file_type)
+            else:
+                text = extract_cv_text(file_bytes, file_type, max_chars=self.cv_max_chars)
+        with metrics.span("cv_compact"):
+            return compact_cv(text, token_budget=self.cv_token_budget)
+
+    def analyze_cv(self, cv_text, stream=False, priority=INTERACTIVE):
+        return self._generate("cv_analysis", cv_analysis_prompt(cv_text), 0.7, 1024, stream, priority)
+
+    def extract_skills(self, cv_analysis, cv_text="", priority=INTERACTIVE):
+        # Matched locally against the skill vocabulary when the analysis names enough of them,
+        # otherwise extracted by the model
+        with metrics.span("skill_match"):
+            skills, confident = match_skills(cv_analysis, cv_text or "")
+        metrics.inc("advisor_skill_extraction_total", source="index" if confident else "llm")
+        if confident:
+            return ", ".join(skills)
+        skill_text = self.router.complete(
+            "skill_extraction", skill_extraction_prompt(cv_analysis), 0.3, 200, priority=priority
+        )
+        return _SKILL_PREFIX_RE.sub('', skill_text).strip()
+
+    # --- Returning users (advisor.profile_store) ---
+    def plan_cv_analysis(self, compaction):
+        """Find the stored profile an ingested CV descends from and decide what the LLM has to redo.
+
+        The plan's mode is "reuse" (no section changed: the stored analysis and skills apply),
+        "update" (only added and changed sections are sent, to merge into the stored analysis)
+        or "full" (no stored analysis to build on).
+        """
+        section_texts = compaction.get("section_texts") or {}
+        profile = self.profile_store.find(section_texts) if self.profile_store is not None else None
+        plan = {"mode": "full", "profile_id": None, "section_texts": section_texts, "diff": None,
+                "previous_analysis": None, "previous_skills": None}
+        if profile is not None:
+            plan["profile_id"] = profile["profile_id"]
+            if profile["analysis"]:
+                diff = diff_sections(profile["section_digests"], section_texts)
+                plan.update({
+                    "mode": "update" if diff["changed"] or diff["added"] or diff["removed"] else "reuse",
+                    "diff": diff,
+                    "previous_analysis": profile["analysis"],
+                    "previous_skills": profile["skills"],
+                })
+        metrics.inc("advisor_cv_analysis_total", mode=plan["mode"])
+        return plan
+
+    def analyze_cv_incremental(self, plan, cv_text, stream=False, priority=INTERACTIVE):
+        # Same result as analyze_cv, but a returning user's unchanged CV costs nothing and an edited one
+        # only sends its added/changed sections
+        if plan["mode"] == "reuse":
+            return iter([plan["previous_analysis"]]) if stream else plan["previous_analysis"]
+        if plan["mode"] == "update":
+            diff = plan["diff"]
+            # Each changed section gets the room it has in the compacted CV a full analysis would see
+            packed = compact_sections(plan["section_texts"], self.cv_token_budget)
+            changed = {name: packed[name] for name in diff["changed"] + diff["added"] if name in packed}
+            messages = cv_update_prompt(plan["previous_analysis"], changed, diff["removed"])
+            # The previous analysis travels with the changes; when that outweighs the compacted CV, start over
+            if _prompt_tokens(messages) < _prompt_tokens(cv_analysis_prompt(cv_text)):
+                return self._generate("cv_analysis", messages, 0.7, 1024, stream, priority)
+            metrics.inc("advisor_cv_update_fallback_total")
+        return self.analyze_cv(cv_text, stream, priority)
+
+    def extract_skills_incremental(self, plan, cv_analysis, cv_text="", priority=INTERACTIVE):
+        if plan["mode"] == "reuse" and plan["previous_skills"]:
+            return plan["previous_skills"]
+        return self.extract_skills(cv_analysis, cv_text, priority)
+
+    def save_cv_profile(self, plan, cv_digest, cv_analysis, skills):
+        """Store the analyzed CV version under its profile (a new one for a first visit); returns the profile id."""
+        if self.profile_store is None:
+            return None
+        return self.profile_store.save(plan["profile_id"], cv_digest, plan["section_texts"], cv_analysis, skills)
+
+    # --- Career paths and learning ---
+    def career_paths(self, skills, interests, experience, stream=False, priority=INTERACTIVE):
+        return self._generate("career_paths", career_paths_prompt(skills, interests, experience), 0.7, 1024, stream, priority)
+
+    def learning_materials(self, skill, experience_level, stream=False, priority=INTERACTIVE):
+        return self._generate("learning_guide", learning_guide_prompt(skill, experience_level), 0.5, 1024, stream, priority)
+
+    # --- Tests ---
+    def generate_test(self, skill, experience_level, priority=INTERACTIVE, avoid_questions=()):
+        """Generate one batch of questions, none of them in `avoid_questions`; returns (questions_data, correct_answers)."""
+        if self.test_format == "json":
+            return generate_structured_test(
+                # Every top-up batch must bring new questions
+                lambda *args, **kwargs: self.router.complete("test", *args, use_cache=False, priority=priority, **kwargs),
+                skill,
+                experience_level,
+                num_questions=self.question_batch,
+                avoid_questions=avoid_questions,
+            )
+        test_content = self.router.complete(
+            "test",
+            test_prompt(skill, experience_level, num_questions=self.question_batch, avoid_questions=avoid_questions),
+            0.3,
+            max(1024, 200 * self.question_batch),
+            use_cache=False,  # Every top-up batch must bring new questions
+            priority=priority,
+        )
+        with metrics.span("test_parse"):
+            return parse_test_content(test_content)
+
+    def top_up_question_bank(self, skill, experience_level, seen_question_ids=(), min_available=None, priority=INTERACTIVE):
+        return self.question_bank.top_up(
+            skill, experience_level,
+            lambda skill, experience_level, avoid_questions: self.generate_test(
+                skill, experience_level, priority=priority, avoid_questions=avoid_questions
+            ),
+            min_available=self.question_low_water if min_available is None else min_available,
+            exclude_ids=seen_question_ids,
+        )
+
+    def sample_test(self, skill, experience_level, num_questions=5, seen_question_ids=(), priority=INTERACTIVE):
+        """Return up to `num_questions` bank questions (dicts with id, question, options, answer)."""
+        if self.question_bank.available(skill, experience_level, seen_question_ids) < num_questions:
+            self.top_up_question_bank(skill, experience_level, seen_question_ids, min_available=num_questions, priority=priority)
+        with metrics.span("test_sample"):
+            return self.question_bank.sample(skill, experience_level, num_questions, seen_question_ids)
+
+    # --- Enhancement strategy ---
+    def enhancement_strategy(self, skill, experience_level, percentage, stream=False, priority=INTERACTIVE):
+        return self._generate(
+            "enhancement_strategy", enhancement_strategy_prompt(percentage, skill, experience_level), 0.6, 1024, stream, priority
+        )
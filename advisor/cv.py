@@ -0,0 +1,288 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import struct
+import subprocess
+import sys
+import threading
+
+import PyPDF2
+import docx
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PDF_MIME = "application/pdf"
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+DEFAULT_MAX_CHARS = 20000
+DEFAULT_MAX_PAGES = 50
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Put on the workers' PYTHONPATH
+PAGE_BREAK = "\f"  # Between PDF pages in extracted text, so page headers/footers can be told apart from content
+
+
+class ExtractionError(Exception):
+    pass
+
+
+class ExtractionTimeout(ExtractionError):
+    pass
+
+
+def document_digest(file_bytes):
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+def normalize_text(text):
+    text = text.replace("\x00", "").replace("\r\n", "\n").replace("\r", "\n")
+    text = re.sub(r'[ \t\f\v\u00a0]+', ' ', text)
+    text = "\n".join(line.strip() for line in text.split("\n"))
+    return re.sub(r'\n{3,}', '\n\n', text).strip()
+
+
+class _TextBudget:
+    # Collects normalized blocks until the character budget is spent; joined once at the end
+    def __init__(self, max_chars):
+        self.max_chars = max_chars
+        self.blocks = []
+        self.size = 0
+
+    @property
+    def full(self):
+        return self.size >= self.max_chars
+
+    def add(self, text):
+        text = normalize_text(text or "")
+        if text and not self.full:
+            text = text[:self.max_chars - self.size]
+            self.blocks.append(text)
+            self.size += len(text) + 1
+
+    def page_break(self):
+        # Added as is: normalize_text would turn the form feed into a space
+        if self.blocks and not self.full:
+            self.blocks.append(PAGE_BREAK)
+            self.size += len(PAGE_BREAK) + 1
+
+    def text(self):
+        return "\n".join(self.blocks)
+
+
+def _extract_pdf(file_bytes, budget, max_pages):
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_bytes))
+    # Pages are parsed one at a time and parsing stops as soon as the budget is reached
+    for index, page in enumerate(pdf_reader.pages):
+        if index >= max_pages or budget.full:
+            break
+        if index:
+            budget.page_break()
+        budget.add(page.extract_text() or "")
+
+
+def _docx_table_text(table):
+    rows = []
+    for row in table.rows:
+        cells = []
+        for cell in row.cells:
+            # Merged cells are returned once per grid position; keep each distinct text once per row
+            cell_text = " ".join(p.text for p in cell.paragraphs).strip()
+            if cell_text and cell_text not in cells:
+                cells.append(cell_text)
+        if cells:
+            rows.append(" | ".join(cells))
+    return "\n".join(rows)
+
+
+def _extract_docx(file_bytes, budget):
+    doc = docx.Document(io.BytesIO(file_bytes))
+
+    # Headers and footers first (many CVs keep name and contact details there), each distinct text once
+    seen = set()
+    for section in doc.sections:
+        for part in (section.header, section.footer):
+            part_text = "\n".join(p.text for p in part.paragraphs).strip()
+            if part_text and part_text not in seen:
+                seen.add(part_text)
+                budget.add(part_text)
+
+    # Body paragraphs and tables in document order; skills are often laid out in tables
+    for block in doc.iter_inner_content():
+        if budget.full:
+            break
+        if isinstance(block, docx.table.Table):
+            budget.add(_docx_table_text(block))
+        else:
+            budget.add(block.text)
+
+
+def extract_cv_text(file_bytes, file_type, max_chars=DEFAULT_MAX_CHARS, max_pages=DEFAULT_MAX_PAGES):
+    """Return normalized CV text, stopping once `max_chars` characters have been collected."""
+    budget = _TextBudget(max_chars)
+    if file_type == PDF_MIME:
+        _extract_pdf(file_bytes, budget, max_pages)
+    elif file_type == DOCX_MIME:
+        _extract_docx(file_bytes, budget)
+    return budget.text()
+
+
+def _write_frame(stream, data):
+    stream.write(struct.pack(">I", len(data)) + data)
+    stream.flush()
+
+
+def _read_frame(stream):
+    # Blocking read of one length-prefixed frame; None at end of stream
+    header = stream.read(4)
+    if len(header) < 4:
+        return None
+    (size,) = struct.unpack(">I", header)
+    data = stream.read(size)
+    return data if len(data) == size else None
+
+
+def _worker_main(memory_limit_mb):
+    # Worker loop (python -m advisor.cv --worker): one request frame (options as JSON, then the document)
+    # in on stdin, one JSON reply frame out on stdout, until stdin closes
+    requests = sys.stdin.buffer
+    replies = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())  # A parser printing to stdout must not corrupt the replies
+    if memory_limit_mb and resource is not None:
+        try:
+            limit = memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ValueError, OSError):
+            pass  # Not allowed here; the timeout still applies
+    while True:
+        options, file_bytes = _read_frame(requests), _read_frame(requests)
+        if options is None or file_bytes is None:
+            return
+        options = json.loads(options)
+        exhausted = False
+        try:
+            reply = ["ok", extract_cv_text(file_bytes, options["file_type"], options["max_chars"], options["max_pages"])]
+        except MemoryError:
+            reply, exhausted = ["error", "The document needs too much memory to extract."], True
+        except Exception as e:
+            reply = ["error", str(e)]
+        _write_frame(replies, json.dumps(reply).encode("utf-8"))
+        if exhausted:
+            return  # Start clean: the parent replaces a worker that exited
+
+
+class _Worker:
+    # A long-lived extraction process; replies are read with a deadline so a stuck parse can be killed
+    def __init__(self, memory_limit_mb):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(path for path in (_PACKAGE_ROOT, env.get("PYTHONPATH")) if path)
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "advisor.cv", "--worker", "--memory-limit-mb", str(memory_limit_mb or 0)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env,
+        )
+
+    @property
+    def alive(self):
+        return self.process.poll() is None
+
+    def request(self, file_bytes, options, timeout):
+        try:
+            _write_frame(self.process.stdin, json.dumps(options).encode("utf-8"))
+            _write_frame(self.process.stdin, file_bytes)
+        except OSError:
+            raise ExtractionError("Text extraction stopped unexpectedly.")
+        # Read in a thread with a timed join (select() cannot wait on pipes on Windows); after a
+        # timeout the caller kills the worker, which ends the blocked read
+        reply = []
+        reader = threading.Thread(target=lambda: reply.append(_read_frame(self.process.stdout)), daemon=True)
+        reader.start()
+        reader.join(timeout)
+        if reader.is_alive():
+            raise ExtractionTimeout(f"Text extraction took longer than {timeout:g} seconds.")
+        if not reply or reply[0] is None:
+            raise ExtractionError("Text extraction stopped unexpectedly.")
+        return json.loads(reply[0])
+
+    def close(self, kill=False):
+        if kill:
+            self.process.kill()
+        else:
+            self.process.stdin.close()  # The worker exits at the end of its input
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            stream.close()
+
+
+class IsolatedExtractor:
+    """Runs extraction in separate worker processes with a per-document time and memory limit.
+
+    `max_workers` long-lived workers are started up front and reused, so at most that
+    many documents are parsed at once; a worker that overruns its limits is killed and
+    replaced instead of stalling the server thread that uploaded the document.
+    """
+
+    def __init__(self, max_workers=4, timeout=10.0, memory_limit_mb=512, max_chars=DEFAULT_MAX_CHARS, max_pages=DEFAULT_MAX_PAGES):
+        # Workers are fresh interpreters (python -m advisor.cv), not forks of the threaded server and not
+        # multiprocessing spawn/forkserver children, which would re-run the Streamlit page script as __main__
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._lock = threading.Lock()
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.max_chars = max_chars
+        self.max_pages = max_pages
+        self._idle = [_Worker(memory_limit_mb) for _ in range(max_workers)]
+        self._closed = False
+
+    def _checkout(self):
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.alive:
+                    return worker
+                worker.close(kill=True)
+        return _Worker(self.memory_limit_mb)
+
+    def _checkin(self, worker):
+        with self._lock:
+            if not self._closed and worker.alive:
+                self._idle.append(worker)
+                return
+        worker.close(kill=True)
+
+    def extract(self, file_bytes, file_type):
+        options = {"file_type": file_type, "max_chars": self.max_chars, "max_pages": self.max_pages}
+        with self._slots:
+            worker = self._checkout()
+            try:
+                status, payload = worker.request(file_bytes, options, self.timeout)
+            except BaseException:
+                # Timed out, died or interrupted mid-document: its state is unknown, so it is not reused
+                worker.close(kill=True)
+                raise
+            self._checkin(worker)
+        if status != "ok":
+            raise ExtractionError(payload)
+        return payload
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CV text extraction worker (see IsolatedExtractor).")
+    parser.add_argument("--worker", action="store_true")
+    parser.add_argument("--memory-limit-mb", type=int, default=0)
+    args = parser.parse_args()
+    if args.worker:
+        _worker_main(args.memory_limit_mb)
@@ -0,0 +1,169 @@
+import re
+from collections import Counter
+
+from advisor.cv import PAGE_BREAK, normalize_text
+
+# Section name -> heading patterns, in the order sections are packed when the budget is tight
+SECTION_HEADINGS = {
+    "skills": r"(technical |core |key )?skills|skill set|competenc(e|ies)|technologies|tools|tech stack",
+    "experience": r"(professional |work |relevant )?experience|employment( history)?|work history|career history",
+    "certifications": r"certifications?|certificates?|licen[cs]es?( (and|&) certifications?)?|courses|training",
+    "summary": r"(professional )?summary|profile|objective|about( me)?",
+    "projects": r"(personal |key )?projects",
+    "education": r"education|academic (background|qualifications)|qualifications",
+}
+PACKING_ORDER = ["skills", "experience", "certifications", "summary", "projects", "education", "header"]
+
+_HEADING_RES = {
+    name: re.compile(rf"^\W*({pattern})\W*$", re.IGNORECASE) for name, pattern in SECTION_HEADINGS.items()
+}
+_PAGE_NUMBER_RE = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+EDGE_LINES = 2  # Lines at the top and bottom of a page checked for running headers/footers
+
+
+def count_tokens(text):
+    # Same ~4 characters per token estimate the request scheduler uses
+    return (len(text) + 3) // 4
+
+
+def _page_edges(lines, edge_lines=EDGE_LINES):
+    # {index: "top"/"bottom"} for the first and last few non-empty lines of a page, where running headers/footers sit
+    filled = [i for i, line in enumerate(lines) if line]
+    edges = {i: "bottom" for i in filled[-edge_lines:]}
+    edges.update({i: "top" for i in filled[:edge_lines]})
+    return edges
+
+
+def _is_page_number(line, page_number):
+    # "Page 2", "2 of 3" and "2/3" always; a bare number only when it is this page's number (not a year)
+    if not _PAGE_NUMBER_RE.match(line):
+        return False
+    return not line.isdigit() or int(line) == page_number
+
+
+def _drop_page_furniture(pages):
+    # Page numbers and short lines repeated at the same edge (top or bottom) of most pages - the name or
+    # contact line - are running headers/footers: keep the first copy. Lines elsewhere on a page are never
+    # dropped, and a document without page breaks (DOCX, single-page PDF) is returned as is.
+    if len(pages) < 2:
+        return [line for lines in pages for line in lines]
+    edges = [_page_edges(lines) for lines in pages]
+    counts = Counter(
+        key for lines, edge in zip(pages, edges)
+        for key in {(lines[i], side) for i, side in edge.items() if len(lines[i]) <= 80}
+    )
+    repeated = {key for key, count in counts.items() if count >= 2 and count * 2 >= len(pages)}
+    seen = set()
+    kept = []
+    for page_number, (lines, edge) in enumerate(zip(pages, edges), 1):
+        for i, line in enumerate(lines):
+            if i in edge:
+                if _is_page_number(line, page_number):
+                    continue
+                if (line, edge[i]) in repeated:
+                    if line in seen:
+                        continue
+                    seen.add(line)
+            kept.append(line)
+    return kept
+
+
+def _heading(line):
+    if not line or len(line) > 40:
+        return None
+    for name, heading_re in _HEADING_RES.items():
+        if heading_re.match(line):
+            return name
+    return None
+
+
+def split_sections(text):
+    """Return [(section_name, heading_line, body_lines)] in document order.
+
+    Lines before the first recognised heading form the "header" section; a
+    repeated heading (e.g. a second "Experience" block) continues the first one.
+    Only a label on its own line is a heading: an inline "Tools: Git, Jira" inside
+    a job stays content of the current section.
+    """
+    sections = {"header": (None, [])}
+    current = "header"
+    pages = [normalize_text(page).split("\n") for page in text.split(PAGE_BREAK)]
+    for line in _drop_page_furniture(pages):
+        name = _heading(line)
+        if name is None:
+            if line:
+                sections[current][1].append(line)
+            continue
+        if name not in sections:
+            sections[name] = (line, [])
+        current = name
+    return [(name, heading, body) for name, (heading, body) in sections.items() if body or heading]
+
+
+def _truncate_lines(lines, max_tokens):
+    kept, used = [], 0
+    for line in lines:
+        cost = count_tokens(line) + 1
+        if used + cost > max_tokens:
+            remaining_chars = (max_tokens - used) * 4
+            if remaining_chars > 40:
+                kept.append(line[:remaining_chars].rsplit(" ", 1)[0] + " ...")
+            break
+        kept.append(line)
+        used += cost
+    return kept
+
+
+def compact_cv(text, token_budget=1500):
+    """Fit the CV into `token_budget` tokens, keeping the most relevant sections.
+
+    Every detected section first gets an equal share of the budget (or what it needs,
+    if less); what is left goes to sections in PACKING_ORDER. Returns a dict with the
+    compacted text, the detected section names, each section's full text (for diffing
+    against a stored version, see advisor.profile_store) and the token counts / compression ratio.
+    """
+    sections = split_sections(text)
+    original_tokens = count_tokens(text)
+    compacted = "\n\n".join(_pack_sections(sections, token_budget).values())
+    compact_tokens = count_tokens(compacted)
+    return {
+        "text": compacted,
+        "sections": [name for name, _, _ in sections],
+        "section_texts": {name: "\n".join(body) for name, _, body in sections},
+        "original_tokens": original_tokens,
+        "compact_tokens": compact_tokens,
+        "compression_ratio": compact_tokens / original_tokens if original_tokens else 1.0,
+    }
+
+
+def compact_sections(section_texts, token_budget=1500):
+    """Fit {section_name: text} (a CV's section_texts) into `token_budget` tokens like compact_cv; returns {name: text}."""
+    sections = [(name, None, [line for line in text.split("\n") if line]) for name, text in section_texts.items()]
+    return _pack_sections(sections, token_budget)
+
+
+def _pack_sections(sections, token_budget):
+    # {name: packed text} for [(name, heading, body_lines)], dropping sections that get no room
+    sizes = {name: sum(count_tokens(line) + 1 for line in body) for name, _, body in sections}
+    headings_cost = sum(count_tokens(heading) + 1 for _, heading, _ in sections if heading)
+    budget = max(token_budget - headings_cost, 0)
+
+    allowance = {name: 0 for name in sizes}
+    if sections:
+        share = budget // len(sections)
+        for name in sizes:
+            allowance[name] = min(sizes[name], share)
+        remaining = budget - sum(allowance.values())
+        for name in sorted(sizes, key=PACKING_ORDER.index):
+            extra = min(sizes[name] - allowance[name], remaining)
+            allowance[name] += extra
+            remaining -= extra
+
+    blocks = {}
+    for name, heading, body in sections:
+        kept = _truncate_lines(body, allowance[name])
+        if heading and (kept or not body):
+            blocks[name] = "\n".join([heading] + kept)
+        elif kept:
+            blocks[name] = "\n".join(kept)
+    return blocks
@@ -0,0 +1,152 @@
+from advisor.llm_cache import CompletionCache
+from advisor.scheduler import INTERACTIVE
+
+
+class LatencyBudgetExceeded(Exception):
+    # Raised instead of the client timeout when a request ran past its `timeout`; not retried by the scheduler
+    pass
+
+
+def _is_timeout(error):
+    # groq.APITimeoutError, httpx timeouts and the builtin TimeoutError
+    return isinstance(error, TimeoutError) or type(error).__name__.endswith(("TimeoutError", "Timeout"))
+
+
+def estimate_tokens(messages, max_tokens):
+    # Rough reservation for the tokens-per-minute budget: ~4 characters per prompt token plus the completion cap
+    return sum(len(message["content"]) for message in messages) // 4 + max_tokens
+
+
+def chat_completion(client, cache, model, messages, temperature, max_tokens, use_cache=True, response_format=None,
+                    scheduler=None, priority=INTERACTIVE, timeout=None, on_usage=None):
+    """Return the completion text for a chat request, served from `cache` when possible.
+
+    Pass use_cache=False for prompts whose output should stay random between calls,
+    and response_format={"type": "json_object"} to request JSON mode. With a
+    `scheduler`, the upstream call is rate limited, retried and coalesced with
+    identical in-flight requests (cacheable ones only).
+
+    `timeout` (seconds) overrides the client timeout for this request and turns an
+    overrun into LatencyBudgetExceeded; `on_usage` receives the response's token usage.
+    """
+    key = None
+    if use_cache:
+        key = CompletionCache.make_key(model, messages, temperature, max_tokens, response_format)
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+    request = {}
+    if response_format is not None:
+        request["response_format"] = response_format
+    if timeout is not None:
+        request["timeout"] = timeout
+    estimate = estimate_tokens(messages, max_tokens)
+
+    def call():
+        try:
+            response = client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **request,
+            )
+        except Exception as e:
+            if timeout is not None and _is_timeout(e):
+                raise LatencyBudgetExceeded(f"{model} took longer than {timeout:g} seconds") from e
+            raise
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            if scheduler is not None:
+                scheduler.refund(estimate - usage.total_tokens)
+            if on_usage is not None:
+                on_usage(usage)
+        return response.choices[0].message.content
+
+    if scheduler is None:
+        text = call()
+    else:
+        text = scheduler.run(call, key=key, tokens=estimate, priority=priority)
+    if cache is not None and key is not None and text:
+        cache.set(key, text)
+    return text
+
+
+def _stream_text(stream, on_usage=None):
+    for chunk in stream:
+        # Groq reports the token usage on the last chunk, under x_groq
+        usage = getattr(getattr(chunk, "x_groq", None), "usage", None) or getattr(chunk, "usage", None)
+        if usage is not None and on_usage is not None:
+            on_usage(usage)
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
+
+
+def stream_chat_completion(client, cache, model, messages, temperature, max_tokens, use_cache=True,
+                           scheduler=None, priority=INTERACTIVE, timeout=None, on_usage=None):
+    """Yield the completion text in chunks as the model produces them.
+
+    A cache hit is yielded as a single chunk. The assembled text is cached only
+    once the stream has been fully consumed, so an interrupted rerun never
+    stores a truncated answer. For a stream, `timeout` bounds the wait for the
+    first chunk and every gap between chunks.
+    """
+    key = None
+    if use_cache:
+        key = CompletionCache.make_key(model, messages, temperature, max_tokens)
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+    request = {"timeout": timeout} if timeout is not None else {}
+    estimate = estimate_tokens(messages, max_tokens)
+
+    def usage_seen(usage):
+        # Reported on the last chunk; like chat_completion, give back what the reservation over-estimated
+        if scheduler is not None:
+            scheduler.refund(estimate - usage.total_tokens)
+        if on_usage is not None:
+            on_usage(usage)
+
+    def read(stream):
+        try:
+            yield from _stream_text(stream, usage_seen)
+        except Exception as e:
+            if timeout is not None and _is_timeout(e):
+                raise LatencyBudgetExceeded(f"{model} stalled for more than {timeout:g} seconds") from e
+            raise
+
+    def open_stream():
+        # Opening the request is what fails on 429s, so this is the part the scheduler retries
+        try:
+            return read(client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                **request,
+            ))
+        except Exception as e:
+            if timeout is not None and _is_timeout(e):
+                raise LatencyBudgetExceeded(f"{model} took longer than {timeout:g} seconds to respond") from e
+            raise
+
+    if scheduler is None:
+        chunks = open_stream()
+    else:
+        chunks = scheduler.stream(open_stream, key=key, tokens=estimate, priority=priority)
+    parts = []
+    for piece in chunks:
+        parts.append(piece)
+        yield piece
+    text = "".join(parts)
+    if cache is not None and key is not None and text:
+        cache.set(key, text)
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class CompletionCache:
+    """Two-tier (memory LRU + SQLite) cache for chat completion texts.
+
+    Entries are keyed on the request content (model, messages, temperature,
+    max_tokens), so identical prompts from different sessions share a result.
+    """
+
+    def __init__(self, path=None, max_memory_entries=256, max_disk_entries=5000, ttl_seconds=7 * 24 * 3600):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory = OrderedDict()  # key -> (created_at, text)
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._db = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # One connection shared by all Streamlit script threads, guarded by self._lock
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                "key TEXT PRIMARY KEY, text TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_completions_accessed ON completions(accessed_at)")
+            self._db.commit()
+
+    @staticmethod
+    def make_key(model, messages, temperature, max_tokens, response_format=None):
+        request = {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens}
+        if response_format is not None:
+            request["response_format"] = response_format
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _expired(self, created_at, now):
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[0], now):
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return entry[1]
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute("SELECT text, created_at FROM completions WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    text, created_at = row
+                    if not self._expired(created_at, now):
+                        self._db.execute("UPDATE completions SET accessed_at = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        self._remember(key, created_at, text)
+                        self._stats["disk_hits"] += 1
+                        return text
+                    self._db.execute("DELETE FROM completions WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key, text):
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, text)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO completions (key, text, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, text, now, now),
+                )
+                self._evict_disk(now)
+                self._db.commit()
+            self._stats["writes"] += 1
+
+    def _remember(self, key, created_at, text):
+        self._memory[key] = (created_at, text)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _evict_disk(self, now):
+        if self.ttl_seconds is not None:
+            self._db.execute("DELETE FROM completions WHERE created_at < ?", (now - self.ttl_seconds,))
+        # Drop the least recently used rows once the table grows past its budget
+        (count,) = self._db.execute("SELECT COUNT(*) FROM completions").fetchone()
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM completions WHERE key IN (SELECT key FROM completions ORDER BY accessed_at LIMIT ?)",
+                (overflow,),
+            )
+            self._stats["evictions"] += overflow
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        stats["memory_entries"] = len(self._memory)
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM completions")
+                self._db.commit()
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,213 @@
+import bisect
+import contextlib
+import contextvars
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram bucket upper bounds in seconds, from a cache hit to a slow 70B completion
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+HELP = {
+    "advisor_stage_seconds": "Duration of pipeline stages (extraction, compaction, parsing, script runs)",
+    "advisor_llm_request_seconds": "Latency of routed LLM requests, cache hits included",
+    "advisor_llm_requests_total": "Routed LLM requests by outcome",
+    "advisor_llm_tokens_total": "Tokens reported by response.usage",
+    "advisor_llm_cost_usd_total": "Estimated spend from reported tokens and the model price table",
+    "advisor_llm_fallbacks_total": "Requests retried on the fallback tier after exceeding their latency budget",
+    "advisor_cv_analysis_total": "CV analyses by mode: reused from a stored profile, updated from changed sections, or full",
+}
+
+# The current session's timeline (a deque) while a script run or one of its prefetch jobs is executing
+_timeline = contextvars.ContextVar("advisor_metrics_timeline", default=None)
+
+
+def bind_timeline(timeline):
+    """Send spans recorded in this context (and contexts copied from it) to `timeline`."""
+    _timeline.set(timeline)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """Process-wide counters, latency histograms and pluggable stats collectors.
+
+    Counters and histograms are keyed by name and labels. Collectors are callables
+    returning a flat dict of numbers (e.g. CompletionCache.stats); they are read at
+    export time and published as gauges named advisor_<collector>_<key>.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+        self._collectors = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, amount=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * (len(self.buckets) + 3)  # one per bucket, +Inf, sum, count
+            histogram[bisect.bisect_left(self.buckets, value)] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def event(self, name, seconds, **details):
+        # Timeline entry for the current session only; no-op outside a bound context
+        timeline = _timeline.get()
+        if timeline is not None:
+            timeline.append({"at": time.time() - seconds, "name": name, "seconds": round(seconds, 4), **details})
+
+    @contextlib.contextmanager
+    def span(self, stage, **details):
+        """Time a block as advisor_stage_seconds{stage=...} and add it to the session timeline."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started, **details)
+
+    def record(self, stage, seconds, **details):
+        # For stages timed by the caller (e.g. a whole script run)
+        self.observe("advisor_stage_seconds", seconds, stage=stage)
+        self.event(stage, seconds, **details)
+
+    def register_collector(self, name, collect):
+        with self._lock:
+            self._collectors[name] = collect
+
+    def prometheus_text(self):
+        """Render everything in the Prometheus text exposition format."""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(value) for key, value in self._histograms.items()}
+            collectors = dict(self._collectors)
+
+        lines = []
+
+        def header(name, kind):
+            if name in HELP:
+                lines.append(f"# HELP {name} {HELP[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for name in sorted({name for name, _ in counters}):
+            header(name, "counter")
+            for (key_name, labels), value in sorted(counters.items()):
+                if key_name == name:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_number(value)}")
+        for name in sorted({name for name, _ in histograms}):
+            header(name, "histogram")
+            for (key_name, labels), histogram in sorted(histograms.items()):
+                if key_name != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), histogram[:-2]):
+                    cumulative += count
+                    bucket_labels = labels + (("le", _format_number(float(bound))),)
+                    lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_number(histogram[-2])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram[-1]}")
+        for collector_name, collect in sorted(collectors.items()):
+            try:
+                values = collect()
+            except Exception:
+                continue  # A closed resource must not break the export
+            for key, value in sorted(values.items()):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    name = f"advisor_{collector_name}_{key}"
+                    lines.append(f"# TYPE {name} gauge")
+                    lines.append(f"{name} {_format_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def write_file(self, path):
+        # Written to a temporary file and renamed, so readers (e.g. node_exporter's textfile collector) never see half a file
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+
+metrics = Metrics()
+
+
+class MetricsExporter:
+    """Publishes `metrics` to a file rewritten every `interval` seconds and/or over HTTP at /metrics."""
+
+    def __init__(self, metrics, file_path=None, interval=15.0, port=None, host="127.0.0.1"):
+        self.metrics = metrics
+        self.file_path = file_path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._writer = None
+        self._server = None
+        if file_path:
+            self._writer = threading.Thread(target=self._write_loop, name="metrics-writer", daemon=True)
+            self._writer.start()
+        if port:
+            exporter_metrics = metrics
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] != "/metrics":
+                        self.send_error(404)
+                        return
+                    body = exporter_metrics.prometheus_text().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass
+
+            self._server = ThreadingHTTPServer((host, int(port)), Handler)
+            self._server.daemon_threads = True
+            threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+
+    def _write_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.metrics.write_file(self.file_path)
+            except OSError:
+                pass
+
+    def close(self):
+        self._stop.set()
+        if self.file_path:
+            try:
+                self.metrics.write_file(self.file_path)  # Final snapshot on shutdown
+            except OSError:
+                pass
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
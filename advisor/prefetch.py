@@ -0,0 +1,42 @@
+import contextvars
+from concurrent.futures import CancelledError
+
+
+class Prefetcher:
+    """Per-session handle on background generations submitted to a shared executor.
+
+    Futures are keyed by what they produce (e.g. ("materials", skill, level)) so a
+    rerun can pick up a result that was started on an earlier run.
+    """
+
+    def __init__(self, executor):
+        self._executor = executor
+        self._futures = {}
+
+    def submit(self, key, fn, *args, **kwargs):
+        future = self._futures.get(key)
+        if future is None or future.cancelled():
+            # Run in a copy of the caller's context, so the job's spans land on the session's metrics timeline
+            future = self._executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+            self._futures[key] = future
+        return future
+
+    def has(self, key):
+        return key in self._futures
+
+    def result(self, key, pop=False):
+        # Returns None when nothing was prefetched or the prefetch failed; callers then generate inline
+        future = self._futures.pop(key, None) if pop else self._futures.get(key)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except (CancelledError, Exception):
+            self._futures.pop(key, None)
+            return None
+
+    def cancel_all(self):
+        # Futures already running finish in the background; their results are simply dropped
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
@@ -0,0 +1,178 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+
+def section_digest(text):
+    # Sections that differ only in spacing or case count as unchanged
+    normalized = re.sub(r"\s+", " ", text).strip().lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def diff_sections(old_digests, section_texts):
+    """Compare a new upload's sections with a stored version's {name: digest}.
+
+    Returns {"unchanged": [...], "changed": [...], "added": [...], "removed": [...]} of section names.
+    """
+    diff = {"unchanged": [], "changed": [], "added": [], "removed": []}
+    for name, text in section_texts.items():
+        if name not in old_digests:
+            diff["added"].append(name)
+        elif old_digests[name] == section_digest(text):
+            diff["unchanged"].append(name)
+        else:
+            diff["changed"].append(name)
+    diff["removed"] = [name for name in old_digests if name not in section_texts]
+    return diff
+
+
+class ProfileStore:
+    """Returning users' CV sections, analysis, skills and test history, kept across sessions.
+
+    A profile is found again only by document lineage: a stored CV with the same header
+    (contact) section that shares most sections with the new upload. An e-mail address or
+    name typed into an upload proves nothing, so it never selects a profile on its own.
+    The caller diffs the sections and only sends what changed to the LLM.
+    """
+
+    def __init__(self, path, min_shared_sections=0.5):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.min_shared_sections = min_shared_sections
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS profiles ("
+            "profile_id TEXT PRIMARY KEY, cv_digest TEXT, analysis TEXT, skills TEXT, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS profile_sections ("
+            "profile_id TEXT NOT NULL, name TEXT NOT NULL, digest TEXT NOT NULL, text TEXT NOT NULL, "
+            "PRIMARY KEY (profile_id, name));"
+            "CREATE INDEX IF NOT EXISTS idx_profile_sections_digest ON profile_sections(digest);"
+            "CREATE TABLE IF NOT EXISTS test_history ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, profile_id TEXT NOT NULL, skill TEXT NOT NULL, level TEXT NOT NULL, "
+            "score INTEGER NOT NULL, total INTEGER NOT NULL, percentage REAL NOT NULL, strategy TEXT, taken_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_test_history_profile ON test_history(profile_id, taken_at);"
+        )
+        self._db.commit()
+
+    # --- Profiles ---
+    def descends_from(self, profile, section_texts):
+        """Whether an upload descends from `profile`'s stored CV: its header section is unchanged
+        and at least `min_shared_sections` of its sections are.
+
+        Classmates share an education section and anyone can type another person's name and
+        e-mail, so neither shared sections nor a header alone make a lineage.
+        """
+        header = section_texts.get("header")
+        if header is None or profile["section_digests"].get("header") != section_digest(header):
+            return False
+        shared = len(diff_sections(profile["section_digests"], section_texts)["unchanged"])
+        return shared >= self.min_shared_sections * len(section_texts)
+
+    def find(self, section_texts, max_candidates=5):
+        """Return the stored profile the upload descends from, or None."""
+        if "header" not in section_texts:
+            return None
+        digests = [section_digest(text) for text in section_texts.values()]
+        with self._lock:
+            candidates = self._db.execute(
+                f"SELECT profile_id, COUNT(*) AS shared FROM profile_sections "
+                f"WHERE digest IN ({', '.join('?' * len(digests))}) "
+                f"GROUP BY profile_id HAVING shared >= ? ORDER BY shared DESC LIMIT ?",
+                digests + [self.min_shared_sections * len(digests), max_candidates],
+            ).fetchall()
+        for profile_id, _ in candidates:
+            profile = self.load(profile_id)
+            if profile is not None and self.descends_from(profile, section_texts):
+                return profile
+        return None
+
+    def load(self, profile_id):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT profile_id, cv_digest, analysis, skills, updated_at FROM profiles WHERE profile_id = ?",
+                (profile_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            sections = self._db.execute(
+                "SELECT name, digest, text FROM profile_sections WHERE profile_id = ?", (profile_id,)
+            ).fetchall()
+        return {
+            "profile_id": row[0],
+            "cv_digest": row[1],
+            "analysis": row[2],
+            "skills": row[3],
+            "updated_at": row[4],
+            "section_digests": {name: digest for name, digest, _ in sections},
+            "section_texts": {name: text for name, _, text in sections},
+        }
+
+    def save(self, profile_id, cv_digest, section_texts, analysis, skills):
+        """Store the analyzed version of a CV (replacing the previous one); returns the profile id.
+
+        An upload that does not descend from the stored profile is saved as a new profile instead.
+        """
+        if profile_id:
+            profile = self.load(profile_id)
+            if profile is not None and not self.descends_from(profile, section_texts):
+                profile_id = None
+        profile_id = profile_id or uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO profiles (profile_id, cv_digest, analysis, skills, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(profile_id) DO UPDATE SET "
+                "cv_digest = excluded.cv_digest, analysis = excluded.analysis, "
+                "skills = excluded.skills, updated_at = excluded.updated_at",
+                (profile_id, cv_digest, analysis, skills, now, now),
+            )
+            self._db.execute("DELETE FROM profile_sections WHERE profile_id = ?", (profile_id,))
+            self._db.executemany(
+                "INSERT INTO profile_sections (profile_id, name, digest, text) VALUES (?, ?, ?, ?)",
+                [(profile_id, name, section_digest(text), text) for name, text in section_texts.items()],
+            )
+            self._db.commit()
+        return profile_id
+
+    # --- Test history ---
+    def record_test(self, profile_id, skill, experience_level, score, total, percentage):
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO test_history (profile_id, skill, level, score, total, percentage, taken_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (profile_id, skill, experience_level, score, total, percentage, time.time()),
+            )
+            self._db.commit()
+        return cursor.lastrowid
+
+    def set_test_strategy(self, test_id, strategy):
+        with self._lock:
+            self._db.execute("UPDATE test_history SET strategy = ? WHERE id = ?", (strategy, test_id))
+            self._db.commit()
+
+    def test_history(self, profile_id, limit=20):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT skill, level, score, total, percentage, strategy, taken_at FROM test_history "
+                "WHERE profile_id = ? ORDER BY taken_at DESC LIMIT ?",
+                (profile_id, limit),
+            ).fetchall()
+        return [
+            {"skill": r[0], "level": r[1], "score": r[2], "total": r[3], "percentage": r[4], "strategy": r[5], "taken_at": r[6]}
+            for r in rows
+        ]
+
+    def count(self):
+        with self._lock:
+            (count,) = self._db.execute("SELECT COUNT(*) FROM profiles").fetchone()
+        return count
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,106 @@
+# Prompt builders shared by the Streamlit page and background/offline jobs
+
+
+def career_paths_prompt(skills, interests, experience):
+    return [{
+        "role": "user",
+        "content": f"Suggest 3 detailed career paths for:\n"
+                   f"Skills: {skills}\nInterests: {interests}\n"
+                   f"Experience: {experience}\n"
+                   "Format each with:\n"
+                   "- Title\n- Description\n"
+                   "- Required Certifications\n"
+                   "- Average Salary Range\n"
+                   "- Growth Outlook"
+    }]
+
+
+def cv_analysis_prompt(cv_text):
+    # cv_text is expected to be compacted to the prompt budget already (see advisor.cv_compact)
+    return [{
+        "role": "user",
+        "content": f"Analyze this CV and suggest 3 detailed career paths:\n{cv_text}\n"
+                   "Format each with:\n"
+                   "- Title\n- Description\n"
+                   "- Required Certifications\n"
+                   "- Average Salary Range\n"
+                   "- Growth Outlook"
+    }]
+
+
+def cv_update_prompt(previous_analysis, changed_sections, removed_sections=()):
+    # Incremental re-analysis of an edited CV: only the added/changed sections are sent, with the analysis of the
+    # previous version to merge them into (see advisor.profile_store)
+    changes = "\n\n".join(f"[{name}]\n{text}" for name, text in changed_sections.items())
+    removed = f"\nThese sections were removed from the CV: {', '.join(removed_sections)}.\n" if removed_sections else ""
+    return [{
+        "role": "user",
+        "content": f"Update this CV analysis of 3 detailed career paths for a new version of the same CV.\n"
+                   f"Previous analysis:\n{previous_analysis}\n\n"
+                   f"Added or changed CV sections:\n{changes}\n{removed}\n"
+                   "Keep what still applies, revise what the changes affect, and return the complete analysis.\n"
+                   "Format each with:\n"
+                   "- Title\n- Description\n"
+                   "- Required Certifications\n"
+                   "- Average Salary Range\n"
+                   "- Growth Outlook"
+    }]
+
+
+def skill_extraction_prompt(cv_analysis):
+    return [{
+        "role": "user",
+        "content": f"From the following career analysis, extract a list of 3-5 key technical skills mentioned as 'Required Certifications' or skills implied as necessary for career growth. List them separated by commas. If no specific technical skills are mentioned, infer some general technical skills from the career paths (e.g., 'Python Programming', 'Data Analysis', 'Cloud Computing'). Do not include introductory phrases, just the comma-separated skills."
+                   f"\n\n{cv_analysis}"
+    }]
+
+
+def learning_guide_prompt(skill, experience_level):
+    return [{
+        "role": "user",
+        "content": f"Create a beginner-friendly learning guide for {skill} suitable for a {experience_level} level individual. "
+                   "Include:\n"
+                   "1. Key concepts (bullet points)\n"
+                   "2. Recommended free online resources (actual URLs if possible, otherwise generic types like 'Coursera course', 'YouTube tutorial series')\n"
+                   "3. A practical 2-week study plan (1 hour daily, detailing topics for each day)\n"
+                   "4. Expected outcomes after completing this guide."
+    }]
+
+
+def test_prompt(skill, experience_level, num_questions=5, avoid_questions=()):
+    content = (
+        f"Create a {num_questions}-question multiple choice test about {skill} at {experience_level} level. "
+        "Each question should have a question number (e.g., 'Question 1:'), the question text, and exactly 4 options (A), B), C), D)) on separate lines. "
+        "Ensure there's a blank line between each question and its options. "
+        "Provide the correct answers at the very end, each on a new line, prefixed with 'Correct Answer ' followed by the question number and the correct option (e.g., 'Correct Answer 1: A', 'Correct Answer 2: B'). "
+        "Do NOT show correct answers within the questions or options."
+    )
+    if avoid_questions:
+        # Question bank top-ups: the pool already has these
+        content += " Do not repeat any of these questions:\n" + "\n".join(f"- {q}" for q in avoid_questions)
+    return [{"role": "user", "content": content}]
+
+
+def enhancement_strategy_prompt(percentage, skill, experience_level):
+    enhancement_prompt = f"Based on a test score of {percentage:.0f}% in {skill} for a {experience_level} level, provide a detailed strategy for improvement. " \
+                        "Include:\n" \
+                        "1. Key areas to focus on (specific concepts based on the skill)\n" \
+                        "2. Suggested learning activities (e.g., practice problems, projects, advanced readings)\n" \
+                        "3. A recommended study time commitment per day/week (e.g., 'Dedicate 1-2 hours daily for the next 3 weeks')\n" \
+                        "4. A few advanced resources or next steps for continued learning (e.g., specific books, online courses, certifications).\n" \
+                        "5. A concluding message encouraging the user to continue enhancing their skill."
+    return [{"role": "user", "content": enhancement_prompt}]
+
+
+def test_json_prompt(skill, experience_level, num_questions=5, avoid_questions=()):
+    content = (
+        f"Create {num_questions} multiple choice questions about {skill} at {experience_level} level. "
+        "Respond with a JSON object only, in exactly this shape: "
+        '{"questions": [{"question": "question text", "options": {"A": "...", "B": "...", "C": "...", "D": "..."}, "answer": "A"}]}. '
+        "Each question must have exactly the four options A, B, C and D, and \"answer\" must be the letter of the correct option. "
+        "Do not number the questions and do not reveal the answer inside the question or options."
+    )
+    if avoid_questions:
+        # Questions already in the bank, and when repairing a partial test the ones already accepted
+        content += " Do not repeat any of these questions:\n" + "\n".join(f"- {q}" for q in avoid_questions)
+    return [{"role": "user", "content": content}]
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+KEY_LOCK_STRIPES = 64
+AVOID_QUESTIONS = 30  # Newest pool questions a top-up prompt lists as "do not repeat"
+
+
+def _fingerprint(question_text):
+    # Questions that differ only in numbering, case or spacing count as the same question
+    normalized = re.sub(r'\s+', ' ', question_text).strip().lower()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+class QuestionBank:
+    """Validated multiple-choice questions indexed by (skill, experience level).
+
+    Tests are assembled from the bank; the LLM only tops up a pool in batches
+    when a session is running out of questions it has not seen yet.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # One top-up per pool at a time; pools share a fixed set of striped locks, so free-form skills cannot grow it
+        self._key_locks = [threading.Lock() for _ in range(KEY_LOCK_STRIPES)]
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS questions ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, skill TEXT NOT NULL, level TEXT NOT NULL, "
+            "fingerprint TEXT NOT NULL, question TEXT NOT NULL, options TEXT NOT NULL, answer TEXT NOT NULL, "
+            "created_at REAL NOT NULL, UNIQUE (skill, level, fingerprint))"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def _pool(skill, experience_level):
+        return skill.strip().lower(), experience_level
+
+    def add(self, skill, experience_level, questions_data, correct_answers):
+        # Questions and answers are only aligned when the counts match, so anything else is discarded
+        if not questions_data or len(questions_data) != len(correct_answers):
+            return 0
+        skill_key, level = self._pool(skill, experience_level)
+        added = 0
+        now = time.time()
+        with self._lock:
+            for q_data, answer in zip(questions_data, correct_answers):
+                if len(q_data["options"]) != 4 or answer not in "ABCD":
+                    continue
+                cursor = self._db.execute(
+                    "INSERT OR IGNORE INTO questions (skill, level, fingerprint, question, options, answer, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (skill_key, level, _fingerprint(q_data["question"]), q_data["question"], json.dumps(q_data["options"]), answer, now),
+                )
+                added += cursor.rowcount
+            self._db.commit()
+        return added
+
+    def available(self, skill, experience_level, exclude_ids=()):
+        skill_key, level = self._pool(skill, experience_level)
+        exclude_ids = list(exclude_ids)
+        placeholders = ",".join("?" * len(exclude_ids))
+        query = "SELECT COUNT(*) FROM questions WHERE skill = ? AND level = ?"
+        if exclude_ids:
+            query += f" AND id NOT IN ({placeholders})"
+        with self._lock:
+            (count,) = self._db.execute(query, [skill_key, level] + exclude_ids).fetchone()
+        return count
+
+    def question_texts(self, skill, experience_level, limit=AVOID_QUESTIONS):
+        # The pool's newest question texts, for prompts asking for questions the bank does not have yet
+        skill_key, level = self._pool(skill, experience_level)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT question FROM questions WHERE skill = ? AND level = ? ORDER BY id DESC LIMIT ?",
+                (skill_key, level, limit),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def sample(self, skill, experience_level, n=5, exclude_ids=()):
+        """Return up to n random questions as dicts with id, question, options and answer.
+
+        Unseen questions are preferred; previously seen ones only fill the gap
+        when the pool has fewer than n unseen questions left.
+        """
+        skill_key, level = self._pool(skill, experience_level)
+        exclude_ids = list(exclude_ids)
+        with self._lock:
+            query = "SELECT id, question, options, answer FROM questions WHERE skill = ? AND level = ?"
+            params = [skill_key, level]
+            if exclude_ids:
+                query += f" AND id NOT IN ({','.join('?' * len(exclude_ids))})"
+                params += exclude_ids
+            rows = self._db.execute(query + " ORDER BY RANDOM() LIMIT ?", params + [n]).fetchall()
+            if len(rows) < n and exclude_ids:
+                taken = [row[0] for row in rows]
+                query = "SELECT id, question, options, answer FROM questions WHERE skill = ? AND level = ?"
+                params = [skill_key, level]
+                if taken:
+                    query += f" AND id NOT IN ({','.join('?' * len(taken))})"
+                    params += taken
+                rows += self._db.execute(query + " ORDER BY RANDOM() LIMIT ?", params + [n - len(rows)]).fetchall()
+        return [
+            {"id": row[0], "question": row[1], "options": json.loads(row[2]), "answer": row[3]}
+            for row in rows
+        ]
+
+    def top_up(self, skill, experience_level, generate, min_available=10, exclude_ids=(), max_batches=3):
+        """Call `generate(skill, level, avoid_questions)` -> (questions_data, correct_answers) until the pool
+        is big enough; `avoid_questions` are texts already in the pool that the batch should not repeat.
+
+        Stops early when a batch adds nothing new: the model is repeating itself, and further
+        batches would most likely be spent the same way. Concurrent top-ups of the same pool
+        wait for each other and re-check, so a batch generated for one session also serves the others.
+        """
+        pool = self._pool(skill, experience_level)
+        key_lock = self._key_locks[hash(pool) % len(self._key_locks)]
+        added = 0
+        with key_lock:
+            for _ in range(max_batches):
+                if self.available(skill, experience_level, exclude_ids) >= min_available:
+                    break
+                questions_data, correct_answers = generate(
+                    skill, experience_level, self.question_texts(skill, experience_level)
+                )
+                batch_added = self.add(skill, experience_level, questions_data, correct_answers)
+                added += batch_added
+                if not batch_added:
+                    break
+        return added
+
+    def close(self):
+        with self._lock:
+            self._db.close()
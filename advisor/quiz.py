@@ -0,0 +1,176 @@
+import json
+import re
+import threading
+
+from advisor.metrics import metrics
+from advisor.prompts import test_json_prompt
+
+
+# Function to parse questions and options more robustly
+def parse_test_questions(test_content):
+    questions_data = []
+    # Split by "Question X:" or "X." to get individual questions, handling multiple formats
+    raw_questions = re.split(r'(?:Question\s*\d+\s*:|^\d+\.\s)', test_content, flags=re.MULTILINE)
+    for raw_q in raw_questions:
+        raw_q = raw_q.strip()
+        if not raw_q:
+            continue
+
+        lines = raw_q.split('\n')
+        if not lines:
+            continue
+
+        question_text = lines[0].strip()
+        options = []
+        for line in lines[1:]:
+            line = line.strip()
+            # Ensure options are correctly formatted with A), B), C), D)
+            if re.match(r'^[A-D]\)', line):
+                options.append(line)
+        
+        # Only add question if both text and options are found and exactly 4 options
+        if question_text and options and len(options) == 4:
+            questions_data.append({"question": question_text, "options": options})
+    return questions_data
+
+
+def parse_test_content(test_content):
+    # Split questions from correct answers using regex for robustness
+    parts = re.split(r'(Correct Answer \d+: [A-D])', test_content)
+    raw_questions_part = ""
+    raw_correct_answers_part = ""
+
+    # Reconstruct parts more carefully
+    for part in parts:
+        if re.match(r'Correct Answer \d+: [A-D]', part):
+            raw_correct_answers_part += part.strip() + "\n"
+        else:
+            raw_questions_part += part.strip() + "\n"
+
+    if not raw_questions_part.strip() or not raw_correct_answers_part.strip():
+        return [], []
+
+    questions_data = parse_test_questions(raw_questions_part)
+
+    # Parse correct answers robustly
+    correct_answers = []
+    for line in raw_correct_answers_part.split('\n'):
+        match = re.search(r'Correct Answer \d+: ([A-D])', line)
+        if match:
+            correct_answers.append(match.group(1))
+    return questions_data, correct_answers
+
+
+class ParseStats:
+    """Thread-safe counters for how often generated tests fail validation."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failed_calls = 0  # calls that returned fewer valid questions than requested
+        self.questions_requested = 0
+        self.questions_invalid = 0
+        self.repairs = 0
+
+    def record(self, requested, valid, repair=False):
+        with self._lock:
+            self.calls += 1
+            self.questions_requested += requested
+            self.questions_invalid += max(requested - valid, 0)
+            if valid < requested:
+                self.failed_calls += 1
+            if repair:
+                self.repairs += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "failed_calls": self.failed_calls,
+                "failure_rate": self.failed_calls / self.calls if self.calls else 0.0,
+                "questions_requested": self.questions_requested,
+                "questions_invalid": self.questions_invalid,
+                "repairs": self.repairs,
+            }
+
+
+parse_stats = ParseStats()
+
+
+def _load_json_object(text):
+    try:
+        return json.loads(text)
+    except (TypeError, ValueError):
+        pass
+    # Models sometimes wrap the object in prose or a code fence; fall back to the outermost braces
+    start, end = (text or "").find("{"), (text or "").rfind("}")
+    if start == -1 or end <= start:
+        return None
+    try:
+        return json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+
+
+def parse_test_json(text):
+    # Returns the valid questions (same shape as parse_test_questions) and their answer letters
+    payload = _load_json_object(text)
+    items = payload.get("questions") if isinstance(payload, dict) else payload
+    questions_data, correct_answers = [], []
+    if not isinstance(items, list):
+        return questions_data, correct_answers
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        question_text = str(item.get("question") or "").strip()
+        options = item.get("options")
+        answer = str(item.get("answer") or "").strip().upper()[:1]
+        if isinstance(options, list) and len(options) == 4:
+            options = dict(zip("ABCD", options))
+        if not question_text or not isinstance(options, dict) or answer not in ("A", "B", "C", "D"):
+            continue
+        option_texts = []
+        for letter in "ABCD":
+            option = str(options.get(letter) or "").strip()
+            # Strip a letter prefix the model may have repeated inside the option text
+            option = re.sub(r'^[A-D][\).:]\s*', '', option)
+            if not option:
+                break
+            option_texts.append(f"{letter}) {option}")
+        if len(option_texts) != 4:
+            continue
+        questions_data.append({"question": question_text, "options": option_texts})
+        correct_answers.append(answer)
+    return questions_data, correct_answers
+
+
+def generate_structured_test(complete, skill, experience_level, num_questions=5, max_repairs=2, avoid_questions=()):
+    """Generate a test in JSON mode, re-requesting only the questions that failed validation.
+
+    `complete(messages, temperature, max_tokens, response_format=...)` returns the raw text;
+    `avoid_questions` (e.g. those already in the question bank) are asked not to be repeated.
+    """
+    questions_data, correct_answers = [], []
+    for attempt in range(max_repairs + 1):
+        missing = num_questions - len(questions_data)
+        if missing <= 0:
+            break
+        try:
+            text = complete(
+                test_json_prompt(skill, experience_level, missing, list(avoid_questions) + [q["question"] for q in questions_data]),
+                temperature=0.3,
+                max_tokens=max(512, 220 * missing),
+                response_format={"type": "json_object"},
+            )
+        except Exception as e:
+            # JSON mode rejects output that is not valid JSON with a 400 error; treat it as an empty batch
+            if getattr(e, "status_code", None) != 400:
+                raise
+            text = ""
+        with metrics.span("test_parse"):
+            new_questions, new_answers = parse_test_json(text)
+        new_questions, new_answers = new_questions[:missing], new_answers[:missing]
+        parse_stats.record(missing, len(new_questions), repair=attempt > 0)
+        questions_data += new_questions
+        correct_answers += new_answers
+    return questions_data, correct_answers
@@ -0,0 +1,68 @@
+import atexit
+import threading
+
+
+class ResourceRegistry:
+    """Process-wide named resources (API client, caches, executors, stores).
+
+    Streamlit re-executes the page script on every rerun of every session, but
+    this module is only imported once per process, so anything registered here
+    is created once and shared by all sessions and background threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._resources = {}
+        self._closers = {}
+
+    def get_or_create(self, name, factory, close=None):
+        with self._lock:
+            if name not in self._resources:
+                self._resources[name] = factory()
+                if close is not None:
+                    self._closers[name] = close
+            return self._resources[name]
+
+    def get(self, name):
+        with self._lock:
+            return self._resources.get(name)
+
+    def names(self):
+        with self._lock:
+            return list(self._resources)
+
+    def close(self, name):
+        with self._lock:
+            resource = self._resources.pop(name, None)
+            closer = self._closers.pop(name, None)
+        if resource is not None and closer is not None:
+            closer(resource)
+
+    def close_all(self):
+        # Reverse creation order, so resources registered later (which may use earlier ones) go first
+        for name in reversed(self.names()):
+            try:
+                self.close(name)
+            except Exception:
+                pass
+
+
+registry = ResourceRegistry()
+atexit.register(registry.close_all)
+
+
+def create_groq_client(api_key, max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0,
+                       timeout=60.0, connect_timeout=5.0, max_retries=2):
+    # One keep-alive connection pool for every request of the process, so TLS handshakes are not repeated
+    import httpx
+    from groq import Groq
+
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(timeout, connect=connect_timeout),
+    )
+    return Groq(api_key=api_key, http_client=http_client, max_retries=max_retries)
@@ -0,0 +1,181 @@
+import threading
+import time
+from collections import deque
+
+from advisor.llm import LatencyBudgetExceeded, chat_completion, stream_chat_completion
+from advisor.metrics import metrics
+from advisor.scheduler import INTERACTIVE
+
+# Model tiers; the routes below refer to tiers, so a model upgrade is a one-line change
+TIERS = {
+    "fast": "llama3-8b-8192",
+    "large": "llama3-70b-8192",
+}
+
+# USD per million (prompt, completion) tokens, for the cost counters; unknown models count tokens only
+PRICES_PER_MILLION = {
+    "llama3-8b-8192": (0.05, 0.08),
+    "llama3-70b-8192": (0.59, 0.79),
+}
+
+# Call site -> tier, latency budget (seconds) and the tier to retry on once the budget is spent.
+# Short, mechanical jobs run on the fast tier; open-ended analysis and advice on the large one.
+# A budget is only enforced when there is a fallback; otherwise it is just reported (over_budget).
+ROUTES = {
+    "career_paths": {"tier": "large", "latency_budget": 20.0, "fallback": "fast"},
+    "cv_analysis": {"tier": "large", "latency_budget": 25.0, "fallback": "fast"},
+    "learning_guide": {"tier": "large", "latency_budget": 20.0, "fallback": "fast"},
+    "enhancement_strategy": {"tier": "large", "latency_budget": 20.0, "fallback": "fast"},
+    "skill_extraction": {"tier": "fast", "latency_budget": 5.0, "fallback": None},
+    "test": {"tier": "fast", "latency_budget": 15.0, "fallback": None},
+}
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class _RouteStats:
+    def __init__(self, max_samples):
+        self.calls = 0
+        self.errors = 0
+        self.fallbacks = 0
+        self.over_budget = 0
+        self.upstream_calls = 0  # Calls that reached the API (the rest were cache hits or coalesced)
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.models = {}
+        self.latencies = deque(maxlen=max_samples)
+
+    def snapshot(self):
+        latencies = sorted(self.latencies)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "fallbacks": self.fallbacks,
+            "over_budget": self.over_budget,
+            "upstream_calls": self.upstream_calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "models": dict(self.models),
+            "p50_seconds": _percentile(latencies, 0.5),
+            "p95_seconds": _percentile(latencies, 0.95),
+        }
+
+
+class ModelRouter:
+    """Sends each call site's requests to the model tier its route names.
+
+    A request that runs past its route's latency budget is abandoned and retried
+    once on the fallback tier (for streams: only if nothing has been shown yet).
+    Per-route latency, token and fallback counts are available from stats().
+    """
+
+    def __init__(self, client, cache=None, scheduler=None, routes=None, tiers=None, max_samples=500):
+        self.client = client
+        self.cache = cache
+        self.scheduler = scheduler
+        self.routes = routes or ROUTES
+        self.tiers = tiers or TIERS
+        self._max_samples = max_samples
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def model_for(self, route):
+        return self.tiers[self.routes[route]["tier"]]
+
+    def _attempts(self, route):
+        # [(model, timeout)]: the route's tier under its budget, then the fallback tier under the client timeout
+        config = self.routes[route]
+        fallback = config.get("fallback")
+        if fallback is None or self.tiers[fallback] == self.model_for(route):
+            return [(self.model_for(route), None)]
+        return [(self.model_for(route), config.get("latency_budget")), (self.tiers[fallback], None)]
+
+    def _record(self, route, model, started, usage, fell_back=False, failed=False):
+        elapsed = time.monotonic() - started
+        budget = self.routes[route].get("latency_budget")
+        prompt_tokens = sum(getattr(item, "prompt_tokens", 0) or 0 for item in usage)
+        completion_tokens = sum(getattr(item, "completion_tokens", 0) or 0 for item in usage)
+        outcome = "error" if failed else ("upstream" if usage else "reused")
+        prompt_price, completion_price = PRICES_PER_MILLION.get(model, (0.0, 0.0))
+        cost = (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1e6
+        metrics.observe("advisor_llm_request_seconds", elapsed, route=route, model=model)
+        metrics.inc("advisor_llm_requests_total", route=route, model=model, outcome=outcome)
+        if fell_back:
+            metrics.inc("advisor_llm_fallbacks_total", route=route)
+        if usage:
+            metrics.inc("advisor_llm_tokens_total", prompt_tokens, route=route, model=model, kind="prompt")
+            metrics.inc("advisor_llm_tokens_total", completion_tokens, route=route, model=model, kind="completion")
+            metrics.inc("advisor_llm_cost_usd_total", cost, route=route, model=model)
+        metrics.event(
+            f"llm {route}", elapsed, model=model, outcome=outcome,
+            tokens=prompt_tokens + completion_tokens, cost_usd=round(cost, 6),
+        )
+        with self._lock:
+            stats = self._stats.get(route)
+            if stats is None:
+                stats = self._stats[route] = _RouteStats(self._max_samples)
+            stats.calls += 1
+            stats.errors += failed
+            stats.fallbacks += fell_back
+            stats.over_budget += budget is not None and elapsed > budget
+            stats.models[model] = stats.models.get(model, 0) + 1
+            stats.latencies.append(elapsed)
+            stats.upstream_calls += len(usage)
+            stats.prompt_tokens += prompt_tokens
+            stats.completion_tokens += completion_tokens
+
+    def complete(self, route, messages, temperature, max_tokens, use_cache=True, response_format=None,
+                 priority=INTERACTIVE):
+        attempts = self._attempts(route)
+        started = time.monotonic()
+        usage = []
+        for index, (model, timeout) in enumerate(attempts):
+            try:
+                text = chat_completion(
+                    self.client, self.cache, model, messages, temperature, max_tokens,
+                    use_cache=use_cache, response_format=response_format, scheduler=self.scheduler,
+                    priority=priority, timeout=timeout, on_usage=usage.append,
+                )
+            except LatencyBudgetExceeded:
+                if index + 1 < len(attempts):
+                    continue
+                self._record(route, model, started, usage, fell_back=index > 0, failed=True)
+                raise
+            except Exception:
+                self._record(route, model, started, usage, fell_back=index > 0, failed=True)
+                raise
+            self._record(route, model, started, usage, fell_back=index > 0)
+            return text
+
+    def stream(self, route, messages, temperature, max_tokens, use_cache=True, priority=INTERACTIVE):
+        attempts = self._attempts(route)
+        started = time.monotonic()
+        usage = []
+        for index, (model, timeout) in enumerate(attempts):
+            yielded = False
+            try:
+                for piece in stream_chat_completion(
+                    self.client, self.cache, model, messages, temperature, max_tokens,
+                    use_cache=use_cache, scheduler=self.scheduler, priority=priority,
+                    timeout=timeout, on_usage=usage.append,
+                ):
+                    yielded = True
+                    yield piece
+            except LatencyBudgetExceeded:
+                if not yielded and index + 1 < len(attempts):
+                    continue
+                self._record(route, model, started, usage, fell_back=index > 0, failed=True)
+                raise
+            except Exception:
+                self._record(route, model, started, usage, fell_back=index > 0, failed=True)
+                raise
+            self._record(route, model, started, usage, fell_back=index > 0)
+            return
+
+    def stats(self):
+        with self._lock:
+            return {route: stats.snapshot() for route, stats in self._stats.items()}
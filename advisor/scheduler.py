@@ -0,0 +1,227 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+INTERACTIVE = 0
+PREFETCH = 1
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class RateLimitTimeout(Exception):
+    pass
+
+
+class _StreamAbandoned(Exception):
+    # The leading stream was interrupted (e.g. by a Streamlit rerun); followers issue their own request
+    pass
+
+
+def is_retryable(error):
+    if getattr(error, "status_code", None) in RETRYABLE_STATUS_CODES:
+        return True
+    # groq.APIConnectionError / APITimeoutError and the builtin network errors
+    name = type(error).__name__
+    return isinstance(error, (ConnectionError, TimeoutError)) or name.endswith(("ConnectionError", "TimeoutError"))
+
+
+def _retry_after(error):
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Refills continuously at `rate_per_minute`; holds at most one minute's worth by default."""
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        self._refill()
+        amount = min(amount, self.capacity)  # A request bigger than the bucket waits for a full bucket
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RequestScheduler:
+    """Single gate in front of every upstream completion call of the process.
+
+    - requests-per-minute and tokens-per-minute token buckets shared by all sessions
+    - strict priority: INTERACTIVE requests are admitted before PREFETCH ones
+    - retries with jittered exponential backoff on 429/5xx/connection errors
+    - single-flight: concurrent calls with the same key share one upstream request
+    """
+
+    def __init__(self, requests_per_minute=60, tokens_per_minute=60000, max_retries=3,
+                 base_delay=1.0, max_delay=20.0, max_wait=120.0):
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_wait = max_wait
+        self._cond = threading.Condition()
+        self._waiters = []  # heap of (priority, sequence)
+        self._sequence = itertools.count()
+        self._inflight = {}  # key -> Future shared by coalesced callers
+        self._inflight_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "coalesced": 0, "retries": 0, "throttled": 0, "failures": 0}
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def acquire(self, tokens, priority=INTERACTIVE):
+        ticket = (priority, next(self._sequence))
+        deadline = time.monotonic() + self.max_wait
+        throttled = False
+        with self._cond:
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    wait = None
+                    if self._waiters[0] == ticket:
+                        wait = max(self._requests.wait_time(1), self._tokens.wait_time(tokens))
+                        if wait <= 0:
+                            self._requests.take(1)
+                            self._tokens.take(tokens)
+                            return
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise RateLimitTimeout("Timed out waiting for Groq rate-limit capacity")
+                    if not throttled:
+                        throttled = True
+                        self._count("throttled")
+                    self._cond.wait(min(wait, remaining) if wait is not None else remaining)
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def refund(self, tokens):
+        # Give back the part of a reservation the response did not actually use
+        if tokens > 0:
+            with self._cond:
+                self._tokens.refund(tokens)
+                self._cond.notify_all()
+
+    def _backoff(self, attempt, error):
+        delay = _retry_after(error)
+        if delay is None:
+            delay = min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.5)
+        time.sleep(delay)
+
+    def _call(self, fn, tokens, priority):
+        for attempt in range(self.max_retries + 1):
+            self.acquire(tokens, priority)
+            self._count("requests")
+            try:
+                return fn()
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                self._backoff(attempt, e)
+
+    def _join(self, key):
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            return future, True
+
+    def _leave(self, key, future):
+        with self._inflight_lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def run(self, fn, key=None, tokens=0, priority=INTERACTIVE):
+        """Run `fn()` under the rate limits; callers passing the same key share its result."""
+        if key is None:
+            return self._call(fn, tokens, priority)
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            self._count("coalesced")
+            try:
+                return future.result()
+            except _StreamAbandoned:
+                continue
+        try:
+            result = self._call(fn, tokens, priority)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._leave(key, future)
+
+    def stream(self, open_stream, key=None, tokens=0, priority=INTERACTIVE):
+        """Yield the text chunks of `open_stream()`; only opening the stream is retried.
+
+        A caller that joins an identical in-flight request receives the whole text as one chunk.
+        """
+        future, leader = None, key is None
+        while not leader:
+            future, leader = self._join(key)
+            if leader:
+                break
+            self._count("coalesced")
+            try:
+                yield future.result()
+                return
+            except _StreamAbandoned:
+                continue
+        completed = False
+        try:
+            parts = []
+            for piece in self._call(open_stream, tokens, priority):
+                parts.append(piece)
+                yield piece
+            completed = True
+            if future is not None:
+                future.set_result("".join(parts))
+        except Exception as e:
+            if future is not None:
+                future.set_exception(e)
+            raise
+        finally:
+            if future is not None:
+                if not completed and not future.done():
+                    future.set_exception(_StreamAbandoned())
+                self._leave(key, future)
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        with self._inflight_lock:
+            stats["inflight"] = len(self._inflight)
+        with self._cond:
+            stats["waiting"] = len(self._waiters)
+        return stats
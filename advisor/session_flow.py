@@ -0,0 +1,45 @@
+# What the page shows, as two small state machines instead of loose show_*/test_taken flags:
+#   view:       home -> manual | cv -> enhance     (which main-area section is visible)
+#   test_stage: idle -> testing -> results -> idle (where the user is in the skill assessment)
+
+VIEWS = ("home", "manual", "cv", "enhance")
+TEST_STAGES = ("idle", "testing", "results")
+
+# event -> (new view or None to keep it, new test stage, test stages the event is valid in)
+EVENTS = {
+    "career_requested": ("manual", "idle", TEST_STAGES),
+    "cv_uploaded": ("cv", "idle", TEST_STAGES),
+    "enhance_requested": ("enhance", "idle", TEST_STAGES),
+    "enhance_unavailable": ("home", "idle", TEST_STAGES),
+    "test_started": (None, "testing", ("idle",)),
+    "test_submitted": (None, "results", ("testing",)),
+    "test_reset": (None, "idle", TEST_STAGES),
+}
+
+
+class InvalidTransition(Exception):
+    pass
+
+
+class SessionFlow:
+    """The session's position in the page flow; change it only through dispatch()."""
+
+    __slots__ = ("view", "test_stage")
+
+    def __init__(self):
+        self.view = "home"
+        self.test_stage = "idle"
+
+    def dispatch(self, event):
+        new_view, new_stage, valid_stages = EVENTS[event]
+        if self.test_stage not in valid_stages:
+            raise InvalidTransition(f"{event} is not valid while the test is {self.test_stage}")
+        if new_stage != "idle" and self.view != "enhance":
+            raise InvalidTransition(f"{event} is only valid in the enhancement program")
+        if new_view is not None:
+            self.view = new_view
+        self.test_stage = new_stage
+        return self
+
+    def __repr__(self):
+        return f"SessionFlow(view={self.view!r}, test_stage={self.test_stage!r})"
@@ -0,0 +1,103 @@
+import functools
+import re
+from collections import defaultdict
+
+from advisor.cv_compact import split_sections
+from advisor.skill_vocabulary import ALIAS_ONLY, CERTIFICATIONS, SKILLS
+
+# Occurrence weights. The career analysis names the skills each path needs, so its mentions count most;
+# in the CV itself, a skills or certifications section is stronger evidence than a passing mention.
+ANALYSIS_WEIGHT = 3.0
+REQUIRED_CERTIFICATIONS_WEIGHT = 2.0  # extra, for lines under "Required Certifications"
+SECTION_WEIGHTS = {"skills": 1.5, "certifications": 1.5, "experience": 1.0, "projects": 1.0}
+DEFAULT_SECTION_WEIGHT = 0.5
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+(?:\.[a-z0-9+#]+)*")
+
+
+def tokenize(text):
+    # Lowercase words; keeps "c++", "c#", "node.js", "security+" intact and drops sentence punctuation
+    return _TOKEN_RE.findall(text.lower())
+
+
+class SkillIndex:
+    """Multi-pattern matcher over word tokens (a trie of alias token sequences).
+
+    Scanning is a single pass over the text that takes the longest alias starting
+    at each token, so "aws certified solutions architect" wins over "aws".
+    """
+
+    def __init__(self, vocabulary, alias_only=()):
+        self._root = {}
+        self.max_length = 0
+        for canonical, aliases in vocabulary.items():
+            names = list(aliases) if canonical in alias_only else [canonical] + list(aliases)
+            for name in names:
+                tokens = tokenize(name)
+                if not tokens:
+                    continue
+                node = self._root
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                node[None] = canonical  # None marks the end of an alias
+                self.max_length = max(self.max_length, len(tokens))
+
+    def find(self, text):
+        """Yield canonical names in order of occurrence."""
+        tokens = tokenize(text)
+        i = 0
+        while i < len(tokens):
+            node, match, match_end = self._root, None, i
+            for j in range(i, min(len(tokens), i + self.max_length)):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                if None in node:
+                    match, match_end = node[None], j + 1
+            if match is None:
+                i += 1
+            else:
+                yield match
+                i = match_end
+
+
+@functools.lru_cache(maxsize=1)
+def default_index():
+    return SkillIndex(SKILLS, ALIAS_ONLY)
+
+
+def rank_skills(cv_analysis, cv_text="", index=None):
+    """Score vocabulary skills found in the career analysis and the CV text, best first.
+
+    Returns a list of (canonical_name, score) pairs.
+    """
+    index = index or default_index()
+    scores = defaultdict(float)
+    in_certifications = False
+    for line in (cv_analysis or "").split("\n"):
+        lowered = line.lower()
+        if "required certification" in lowered:
+            in_certifications = True
+        elif re.match(r"^\W*(average salary|growth outlook|description|title)", lowered):
+            in_certifications = False
+        for skill in index.find(line):
+            scores[skill] += ANALYSIS_WEIGHT + (REQUIRED_CERTIFICATIONS_WEIGHT if in_certifications else 0)
+    for name, _, body in split_sections(cv_text or ""):
+        weight = SECTION_WEIGHTS.get(name, DEFAULT_SECTION_WEIGHT)
+        for skill in index.find("\n".join(body)):
+            scores[skill] += weight
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+def match_skills(cv_analysis, cv_text="", min_skills=3, max_skills=5, min_score=ANALYSIS_WEIGHT):
+    """Return (skills, confident) for the skill-enhancement list.
+
+    Certifications are left out (the enhancement program teaches and tests skills).
+    A skill reaches `min_score` (by default ANALYSIS_WEIGHT) with one mention in the
+    career analysis, or from the CV alone when the sections naming it add up to it
+    (e.g. skills + certifications, 1.5 each). Not confident when fewer than
+    `min_skills` skills reach it; callers then fall back to the LLM.
+    """
+    ranked = [(skill, score) for skill, score in rank_skills(cv_analysis, cv_text) if skill not in CERTIFICATIONS]
+    strong = [skill for skill, score in ranked if score >= min_score]
+    return strong[:max_skills], len(strong) >= min_skills
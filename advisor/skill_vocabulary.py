@@ -0,0 +1,126 @@
+# Canonical skill / certification name -> aliases as they appear in CVs and career analyses.
+# The canonical name is always matched as well; aliases are normalized the same way as the text.
+SKILLS = {
+    # Programming languages
+    "Python": ["python3", "python programming"],
+    "Java": ["java programming", "java se", "java ee"],
+    "JavaScript": ["javascript", "js", "ecmascript", "es6"],
+    "TypeScript": [],
+    "C++": ["cpp", "c plus plus"],
+    "C#": ["c sharp", "csharp"],
+    "Go": ["golang"],
+    "Rust": [],
+    "Kotlin": [],
+    "Swift": [],
+    "R": ["r programming", "rstudio"],
+    "SQL": ["structured query language", "t-sql", "pl/sql", "plsql"],
+    "PHP": [],
+    "Ruby": ["ruby on rails", "rails"],
+    "Scala": [],
+    "MATLAB": [],
+    "Bash": ["shell scripting", "bash scripting", "unix shell"],
+    # Web and mobile
+    "HTML/CSS": ["html", "css", "html5", "css3"],
+    "React": ["react.js", "reactjs", "react native"],
+    "Angular": ["angularjs", "angular.js"],
+    "Vue.js": ["vue", "vuejs"],
+    "Node.js": ["nodejs", "express.js", "expressjs"],
+    "Django": [],
+    "Flask": [],
+    "Spring Boot": ["spring framework"],
+    "REST APIs": ["restful apis", "restful", "api design", "rest api"],
+    "GraphQL": [],
+    "Android Development": ["android"],
+    "iOS Development": ["ios developer", "ios apps", "ios app development", "swiftui", "uikit", "xcode"],
+    # Data and AI
+    "Data Analysis": ["data analytics", "analytics", "data analyst", "exploratory data analysis", "eda"],
+    "Data Visualization": ["data visualisation", "dashboards", "dashboarding"],
+    "Machine Learning": ["ml", "machine-learning", "scikit-learn", "sklearn"],
+    "Deep Learning": ["neural networks"],
+    "Natural Language Processing": ["nlp"],
+    "Computer Vision": ["opencv"],
+    "Generative AI": ["genai", "large language models", "llms", "llm", "prompt engineering"],
+    "TensorFlow": ["keras"],
+    "PyTorch": ["torch"],
+    "Pandas": [],
+    "NumPy": [],
+    "Statistics": ["statistical analysis", "statistical modeling", "statistical modelling"],
+    "Data Engineering": ["etl", "data pipelines", "elt"],
+    "Apache Spark": ["spark", "pyspark"],
+    "Hadoop": ["hdfs", "mapreduce"],
+    "Big Data": [],
+    "Data Warehousing": ["data warehouse", "snowflake", "redshift", "bigquery"],
+    "Tableau": [],
+    "Power BI": ["powerbi"],
+    "Excel": ["microsoft excel", "ms excel", "spreadsheets", "advanced excel"],
+    "Databases": ["database management", "rdbms", "database design"],
+    "PostgreSQL": ["postgres"],
+    "MySQL": [],
+    "MongoDB": ["nosql"],
+    # Cloud and infrastructure
+    "Cloud Computing": ["cloud", "cloud services", "cloud platforms"],
+    "AWS": ["amazon web services"],
+    "Microsoft Azure": ["azure"],
+    "Google Cloud": ["gcp", "google cloud platform"],
+    "Docker": ["containers", "containerization", "containerisation"],
+    "Kubernetes": ["k8s"],
+    "DevOps": ["devops practices"],
+    "CI/CD": ["continuous integration", "continuous delivery", "continuous deployment", "jenkins", "github actions"],
+    "Terraform": ["infrastructure as code", "iac"],
+    "Linux": ["unix", "linux administration"],
+    "Networking": ["computer networking", "tcp/ip", "network administration", "cisco ios"],
+    "Git": ["version control", "github", "gitlab"],
+    # Security
+    "Cybersecurity": ["cyber security", "information security", "infosec"],
+    "Penetration Testing": ["pen testing", "ethical hacking"],
+    "Network Security": ["firewalls"],
+    # Engineering practice and design
+    "Software Engineering": ["software development", "software design"],
+    "Object-Oriented Programming": ["oop", "object oriented programming"],
+    "Data Structures and Algorithms": ["data structures", "algorithms", "dsa"],
+    "System Design": ["systems design", "software architecture", "distributed systems"],
+    "Microservices": ["microservice architecture"],
+    "Testing": ["software testing", "unit testing", "test automation", "quality assurance"],
+    "Agile": ["scrum", "kanban", "agile methodologies"],
+    "UI/UX Design": ["ui design", "ux design", "user experience", "figma"],
+    "Blockchain": ["web3", "solidity"],
+    # Business and management
+    "Project Management": ["project planning", "project coordination"],
+    "Product Management": ["product ownership", "product owner"],
+    "Business Analysis": ["business analyst", "requirements gathering"],
+    "Digital Marketing": ["seo", "sem", "social media marketing", "online marketing"],
+    "Financial Analysis": ["financial modeling", "financial modelling", "financial analyst"],
+    "Accounting": ["bookkeeping"],
+    # Certifications
+    "AWS Certified Solutions Architect": ["aws solutions architect", "aws certified solutions architect associate"],
+    "AWS Certified Cloud Practitioner": ["aws cloud practitioner"],
+    "AWS Certified Developer": ["aws developer associate"],
+    "Microsoft Certified: Azure Fundamentals": ["az-900", "azure fundamentals"],
+    "Microsoft Certified: Azure Administrator": ["az-104", "azure administrator"],
+    "Google Professional Data Engineer": ["gcp data engineer", "professional data engineer"],
+    "Google Data Analytics Certificate": ["google data analytics"],
+    "Certified Kubernetes Administrator": ["cka"],
+    "CompTIA Security+": ["security+", "security plus", "comptia security"],
+    "CompTIA Network+": ["network+", "comptia network"],
+    "CompTIA A+": [],
+    "CISSP": ["certified information systems security professional"],
+    "CEH": ["certified ethical hacker"],
+    "PMP": ["project management professional"],
+    "Certified ScrumMaster": ["csm", "scrum master", "professional scrum master", "psm"],
+    "TensorFlow Developer Certificate": ["tensorflow developer"],
+    "Cisco CCNA": ["ccna"],
+    "Oracle Certified Java Programmer": ["ocjp", "oracle certified professional java", "ocp java"],
+    "CFA": ["chartered financial analyst"],
+}
+
+# Canonical names that are certifications rather than skills
+CERTIFICATIONS = {
+    "AWS Certified Solutions Architect", "AWS Certified Cloud Practitioner", "AWS Certified Developer",
+    "Microsoft Certified: Azure Fundamentals", "Microsoft Certified: Azure Administrator",
+    "Google Professional Data Engineer", "Google Data Analytics Certificate", "Certified Kubernetes Administrator",
+    "CompTIA Security+", "CompTIA Network+", "CompTIA A+", "CISSP", "CEH", "PMP", "Certified ScrumMaster",
+    "TensorFlow Developer Certificate", "Cisco CCNA", "Oracle Certified Java Programmer", "CFA",
+}
+
+# Canonical names that are also everyday words (or single letters); only their aliases are matched
+ALIAS_ONLY = {"Go", "R", "Swift", "Rust", "Excel"}
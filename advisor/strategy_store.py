@@ -0,0 +1,151 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+
+from advisor.prompts import enhancement_strategy_prompt
+
+DEFAULT_LEVELS = ["Student", "Entry-level", "Mid-career", "Senior"]
+
+
+def score_buckets(total_questions=5):
+    # Every percentage a test of this length can produce (0, 20, ..., 100 for five questions)
+    return [round(100 * correct / total_questions) for correct in range(total_questions + 1)]
+
+
+def strategy_key(skill, experience_level, percentage):
+    return (skill.strip().lower(), experience_level, int(round(percentage)))
+
+
+class StrategyStore:
+    """Enhancement strategies precomputed per (skill, experience level, test percentage).
+
+    The strategy prompt depends on nothing else, so each bucket is generated once
+    and served to every user who lands in it.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> Future of a background generation
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS strategies ("
+            "skill TEXT NOT NULL, level TEXT NOT NULL, percentage INTEGER NOT NULL, "
+            "text TEXT NOT NULL, created_at REAL NOT NULL, PRIMARY KEY (skill, level, percentage))"
+        )
+        self._db.commit()
+
+    def get(self, skill, experience_level, percentage):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT text FROM strategies WHERE skill = ? AND level = ? AND percentage = ?",
+                strategy_key(skill, experience_level, percentage),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, skill, experience_level, percentage, text):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO strategies (skill, level, percentage, text, created_at) VALUES (?, ?, ?, ?, ?)",
+                strategy_key(skill, experience_level, percentage) + (text, time.time()),
+            )
+            self._db.commit()
+
+    def pending(self, skill, experience_level, percentage):
+        # Future of a background generation for this bucket, if one is still running
+        with self._lock:
+            return self._inflight.get(strategy_key(skill, experience_level, percentage))
+
+    def missing(self, skill, experience_level, percentages):
+        return [p for p in percentages if self.get(skill, experience_level, p) is None]
+
+    def _generate(self, generate, skill, experience_level, percentage):
+        try:
+            text = generate(skill, experience_level, percentage)
+            if text:
+                self.put(skill, experience_level, percentage, text)
+            return text
+        finally:
+            with self._lock:
+                self._inflight.pop(strategy_key(skill, experience_level, percentage), None)
+
+    def warm(self, executor, generate, skill, experience_level, percentages=None):
+        """Queue generation of every missing bucket for (skill, level) and return the futures.
+
+        `generate(skill, experience_level, percentage)` must return the strategy text.
+        Buckets already stored or already being generated are skipped.
+        """
+        futures = []
+        for percentage in self.missing(skill, experience_level, percentages or score_buckets()):
+            key = strategy_key(skill, experience_level, percentage)
+            with self._lock:
+                if key in self._inflight:
+                    continue
+                future = executor.submit(self._generate, generate, skill, experience_level, percentage)
+                self._inflight[key] = future
+            futures.append(future)
+        return futures
+
+    def count(self):
+        with self._lock:
+            (count,) = self._db.execute("SELECT COUNT(*) FROM strategies").fetchone()
+        return count
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def main(argv=None):
+    # Bulk warm-up from a list of popular skills, e.g. before a cohort starts:
+    #   GROQ_API_KEY=... python -m advisor.strategy_store --skills-file popular_skills.txt
+    from concurrent.futures import ThreadPoolExecutor, wait
+
+    from advisor.llm import chat_completion
+    from advisor.routing import ROUTES, TIERS
+    from advisor.resources import create_groq_client
+
+    parser = argparse.ArgumentParser(description="Precompute enhancement strategies for popular skills.")
+    parser.add_argument("--skills", default="", help="Comma separated skills")
+    parser.add_argument("--skills-file", help="File with one skill per line")
+    parser.add_argument("--levels", default=",".join(DEFAULT_LEVELS), help="Comma separated experience levels")
+    parser.add_argument("--store", default=os.environ.get("STRATEGY_STORE_PATH", os.path.join(".cache", "strategies.sqlite")))
+    parser.add_argument("--model", default=TIERS[ROUTES["enhancement_strategy"]["tier"]])
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    skills = [s.strip() for s in args.skills.split(",") if s.strip()]
+    if args.skills_file:
+        with open(args.skills_file, encoding="utf-8") as f:
+            skills += [line.strip() for line in f if line.strip()]
+    levels = [level.strip() for level in args.levels.split(",") if level.strip()]
+    if not skills:
+        parser.error("no skills given")
+
+    client = create_groq_client(os.environ["GROQ_API_KEY"], max_connections=args.workers)
+    store = StrategyStore(args.store)
+
+    def generate(skill, experience_level, percentage):
+        return chat_completion(
+            client, None, args.model,
+            enhancement_strategy_prompt(percentage, skill, experience_level),
+            temperature=0.6,
+            max_tokens=1024,
+        )
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = []
+        for skill in skills:
+            for level in levels:
+                futures += store.warm(executor, generate, skill, level)
+        wait(futures)
+    failed = sum(1 for f in futures if f.exception() is not None)
+    print(f"Generated {len(futures) - failed} strategies ({failed} failed); store now holds {store.count()}.")
+
+
+if __name__ == "__main__":
+    main()
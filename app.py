@@ -1,10 +1,26 @@
 import streamlit as st
-from groq import Groq
 import os
 import tempfile
-import PyPDF2
-import docx
-import re
+import functools
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.errors import StreamlitAPIException
+
+from advisor.artifact_store import ArtifactStore, SessionArtifacts
+from advisor.core import CareerAdvisor, score_test
+from advisor.cv import IsolatedExtractor, document_digest
+from advisor.llm_cache import CompletionCache
+from advisor.metrics import MetricsExporter, bind_timeline, metrics
+from advisor.prefetch import Prefetcher
+from advisor.profile_store import ProfileStore
+from advisor.question_bank import QuestionBank
+from advisor.quiz import parse_stats
+from advisor.routing import TIERS, ModelRouter
+from advisor.resources import create_groq_client, registry
+from advisor.scheduler import PREFETCH, RequestScheduler
+from advisor.session_flow import SessionFlow
+from advisor.strategy_store import StrategyStore
 
 # --- API Key Configuration ---
 GROQ_API_KEY = st.secrets.get("GROQ_API_API_KEY")
@@ -14,19 +30,240 @@ if not GROQ_API_KEY:
     st.info("For Streamlit Cloud: Go to 'Secrets' in your app settings and add `GROQ_API_API_KEY = \"your_key_here\"`.")
     st.info("For local development: Create `.streamlit/secrets.toml` and add `GROQ_API_API_KEY = \"your_key_here\"` (and add `.streamlit/secrets.toml` to `.gitignore`).")
     st.stop()
-else:
-    client = Groq(api_key=GROQ_API_KEY)
+
+
+# --- Shared Resources ---
+# Everything below is created once per server process through advisor.resources.registry and shared by
+# all sessions, reruns and background threads. The Groq client keeps one keep-alive connection pool.
+def get_groq_client():
+    return registry.get_or_create(
+        "groq_client",
+        lambda: create_groq_client(
+            GROQ_API_KEY,
+            max_connections=int(os.environ.get("GROQ_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.environ.get("GROQ_MAX_KEEPALIVE_CONNECTIONS", "10")),
+            timeout=float(os.environ.get("GROQ_TIMEOUT_SECONDS", "60")),
+            connect_timeout=float(os.environ.get("GROQ_CONNECT_TIMEOUT_SECONDS", "5")),
+            max_retries=int(os.environ.get("GROQ_MAX_RETRIES", "0")), # Retries are owned by the request scheduler
+        ),
+        close=lambda groq_client: groq_client.close(),
+    )
+
+client = get_groq_client()
+
+
+# --- Request Scheduler ---
+# Every upstream call of the process passes through one rate-limit-aware gate; set the limits to your Groq plan's
+def get_request_scheduler():
+    return registry.get_or_create(
+        "request_scheduler",
+        lambda: RequestScheduler(
+            requests_per_minute=int(os.environ.get("GROQ_REQUESTS_PER_MINUTE", "60")),
+            tokens_per_minute=int(os.environ.get("GROQ_TOKENS_PER_MINUTE", "60000")),
+            max_retries=int(os.environ.get("GROQ_SCHEDULER_RETRIES", "3")),
+        ),
+    )
+
+request_scheduler = get_request_scheduler()
+
+
+# --- LLM Response Cache ---
+# Identical prompts from any session are answered from memory or disk
+def get_completion_cache():
+    return registry.get_or_create(
+        "completion_cache",
+        lambda: CompletionCache(
+            path=os.environ.get("LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite")),
+            max_memory_entries=int(os.environ.get("LLM_CACHE_MEMORY_ENTRIES", "256")),
+            max_disk_entries=int(os.environ.get("LLM_CACHE_DISK_ENTRIES", "5000")),
+            ttl_seconds=int(os.environ.get("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+        ),
+        close=lambda cache: cache.close(),
+    )
+
+completion_cache = get_completion_cache()
+
+
+# --- Model Routing ---
+# Each call site names a route (advisor.routing.ROUTES) instead of a model: extraction and tests run on the
+# fast tier, analysis and advice on the large one, and a large-tier call over its latency budget is retried fast
+def get_model_router():
+    return registry.get_or_create(
+        "model_router",
+        lambda: ModelRouter(
+            client, completion_cache, request_scheduler,
+            tiers={
+                "fast": os.environ.get("GROQ_FAST_MODEL", TIERS["fast"]),
+                "large": os.environ.get("GROQ_LARGE_MODEL", TIERS["large"]),
+            },
+        ),
+    )
+
+model_router = get_model_router()
+
+
+# --- Background Prefetch ---
+# One worker pool per server process; each session keeps its own Prefetcher handle in session_state
+def get_prefetch_executor():
+    return registry.get_or_create(
+        "prefetch_executor",
+        lambda: ThreadPoolExecutor(max_workers=int(os.environ.get("PREFETCH_WORKERS", "8")), thread_name_prefix="prefetch"),
+        close=lambda executor: executor.shutdown(wait=False, cancel_futures=True),
+    )
+
+
+# --- Enhancement Strategy Store ---
+# Strategies depend only on (skill, level, score), so they are precomputed per bucket and shared by all sessions
+def get_strategy_store():
+    return registry.get_or_create(
+        "strategy_store",
+        lambda: StrategyStore(os.environ.get("STRATEGY_STORE_PATH", os.path.join(".cache", "strategies.sqlite"))),
+        close=lambda store: store.close(),
+    )
+
+strategy_store = get_strategy_store()
+
+
+# --- Question Bank ---
+# Tests are sampled locally; the LLM only tops up a (skill, level) pool in batches when it runs low
+QUESTION_BANK_BATCH = int(os.environ.get("QUESTION_BANK_BATCH", "10"))
+QUESTION_BANK_LOW_WATER = int(os.environ.get("QUESTION_BANK_LOW_WATER", "10"))
+# "json" requests JSON-mode output with targeted repair of invalid questions; "text" keeps the free-text format
+TEST_OUTPUT_FORMAT = os.environ.get("TEST_OUTPUT_FORMAT", "json")
+
+
+def get_question_bank():
+    return registry.get_or_create(
+        "question_bank",
+        lambda: QuestionBank(os.environ.get("QUESTION_BANK_PATH", os.path.join(".cache", "question_bank.sqlite"))),
+        close=lambda bank: bank.close(),
+    )
+
+question_bank = get_question_bank()
+
+
+# --- CV Text Extraction ---
+# Uploads are parsed page by page only until the character budget is reached. By default each document is
+# parsed in one of CV_EXTRACT_WORKERS long-lived worker processes with a time and memory limit, so a huge or
+# malicious file cannot stall the server.
+CV_EXTRACT_MAX_CHARS = int(os.environ.get("CV_EXTRACT_MAX_CHARS", "20000"))
+CV_EXTRACT_ISOLATED = os.environ.get("CV_EXTRACT_ISOLATED", "1").lower() not in ("0", "false", "no")
+# The analysis prompt gets the most relevant CV sections packed into this many tokens
+CV_PROMPT_TOKEN_BUDGET = int(os.environ.get("CV_PROMPT_TOKEN_BUDGET", "1500"))
+
+
+def get_cv_extractor():
+    return registry.get_or_create(
+        "cv_extractor",
+        lambda: IsolatedExtractor(
+            max_workers=int(os.environ.get("CV_EXTRACT_WORKERS", "4")),
+            timeout=float(os.environ.get("CV_EXTRACT_TIMEOUT_SECONDS", "10")),
+            memory_limit_mb=int(os.environ.get("CV_EXTRACT_MEMORY_MB", "512")),
+            max_chars=CV_EXTRACT_MAX_CHARS,
+        ),
+        close=lambda extractor: extractor.close(),
+    )
+
+
+# --- User Profiles ---
+# Analyzed CV sections, analyses, skills and test history persist across sessions. A returning user's upload is
+# matched to their profile by document lineage (an unchanged header and mostly shared sections, never by a typed
+# e-mail or name) and diffed section by section: an unchanged CV reuses the stored analysis, an edited one only
+# sends its changed sections to the LLM.
+# PROFILE_STORE_PATH="" turns this off.
+PROFILE_STORE_PATH = os.environ.get("PROFILE_STORE_PATH", os.path.join(".cache", "profiles.sqlite"))
+
+
+def get_profile_store():
+    if not PROFILE_STORE_PATH:
+        return None
+    return registry.get_or_create(
+        "profile_store",
+        lambda: ProfileStore(PROFILE_STORE_PATH, min_shared_sections=float(os.environ.get("PROFILE_MIN_SHARED_SECTIONS", "0.5"))),
+        close=lambda store: store.close(),
+    )
+
+profile_store = get_profile_store()
+
+
+# --- Pipeline ---
+# All pipeline steps live in advisor.core (shared with the batch CLI, advisor.batch); this page only renders them
+def get_career_advisor():
+    return registry.get_or_create(
+        "career_advisor",
+        lambda: CareerAdvisor(
+            model_router,
+            question_bank=question_bank,
+            extractor=get_cv_extractor() if CV_EXTRACT_ISOLATED else None,
+            test_format=TEST_OUTPUT_FORMAT,
+            question_batch=QUESTION_BANK_BATCH,
+            question_low_water=QUESTION_BANK_LOW_WATER,
+            cv_max_chars=CV_EXTRACT_MAX_CHARS,
+            cv_token_budget=CV_PROMPT_TOKEN_BUDGET,
+            profile_store=profile_store,
+        ),
+    )
+
+career_advisor = get_career_advisor()
+
+
+# --- Artifact Store ---
+# Generated texts (CV text and analysis, career paths, guides, strategies, results) are held once per process,
+# keyed by content hash; session_state only keeps handles. Texts no session references any more are kept up to
+# ARTIFACT_STORE_UNREFERENCED_MB for other sessions to share, least recently released first out.
+def get_artifact_store():
+    return registry.get_or_create(
+        "artifact_store",
+        lambda: ArtifactStore(max_unreferenced_bytes=int(float(os.environ.get("ARTIFACT_STORE_UNREFERENCED_MB", "32")) * 1024 * 1024)),
+    )
+
+artifact_store = get_artifact_store()
+
+
+# --- Streaming ---
+# Long answers are rendered token by token; set STREAM_RESPONSES=0 to fall back to a spinner
+STREAM_RESPONSES = str(st.secrets.get("STREAM_RESPONSES", os.environ.get("STREAM_RESPONSES", "1"))).lower() not in ("0", "false", "no")
+
+
+def render_completion(generate, spinner_text):
+    # Writes the answer of `generate(stream=...)` into the page where it is called and returns the full text
+    if STREAM_RESPONSES:
+        return st.write_stream(generate(stream=True))
+    with st.spinner(spinner_text):
+        text = generate()
+    st.write(text)
+    return text
+
+
+# --- Instrumentation ---
+# Stage timings, LLM latency, tokens, cost, cache and parse counters are collected in advisor.metrics.
+# METRICS_FILE rewrites a Prometheus text file every METRICS_FILE_INTERVAL seconds, METRICS_PORT serves
+# /metrics on localhost for scraping, and DEV_PANEL=1 shows this session's timeline in the sidebar.
+DEV_PANEL = str(st.secrets.get("DEV_PANEL", os.environ.get("DEV_PANEL", "0"))).lower() in ("1", "true", "yes")
+
+
+def get_metrics_exporter():
+    def start():
+        metrics.register_collector("llm_cache", completion_cache.stats)
+        metrics.register_collector("scheduler", request_scheduler.stats)
+        metrics.register_collector("test_parse", parse_stats.snapshot)
+        metrics.register_collector("artifact_store", artifact_store.stats)
+        return MetricsExporter(
+            metrics,
+            file_path=os.environ.get("METRICS_FILE"),
+            interval=float(os.environ.get("METRICS_FILE_INTERVAL", "15")),
+            port=os.environ.get("METRICS_PORT"),
+        )
+    return registry.get_or_create("metrics_exporter", start, close=lambda exporter: exporter.close())
+
+get_metrics_exporter()
 
 
 # Initialize session state variables
-if 'cv_analysis' not in st.session_state:
-    st.session_state.cv_analysis = None
-if 'career_suggestions' not in st.session_state:
-    st.session_state.career_suggestions = None
-if 'enhance_mode' not in st.session_state:
-    st.session_state.enhance_mode = False
-if 'test_taken' not in st.session_state:
-    st.session_state.test_taken = False
+if 'flow' not in st.session_state: # Which section is shown and where the user is in the test (advisor.session_flow)
+    st.session_state.flow = SessionFlow()
+if 'artifacts' not in st.session_state: # Handles to this session's generated texts in the shared artifact store
+    st.session_state.artifacts = SessionArtifacts(artifact_store)
 if 'selected_skill' not in st.session_state:
     st.session_state.selected_skill = ""
 if 'skills' not in st.session_state: # This holds skills from manual input for enhancement if no CV
@@ -37,52 +274,80 @@ if 'correct_answers' not in st.session_state:
     st.session_state.correct_answers = []
 if 'test_questions_data' not in st.session_state: # To store parsed questions and options
     st.session_state.test_questions_data = []
-if 'show_manual_suggestions' not in st.session_state:
-    st.session_state.show_manual_suggestions = False
-if 'show_cv_suggestions' not in st.session_state:
-    st.session_state.show_cv_suggestions = False
-if 'show_enhance_program' not in st.session_state:
-    st.session_state.show_enhance_program = False
-if 'show_test' not in st.session_state: # Explicitly manage test visibility
-    st.session_state.show_test = False
-if 'test_results' not in st.session_state:
-    st.session_state.test_results = None
-if 'enhancement_strategy' not in st.session_state:
-    st.session_state.enhancement_strategy = None
 if 'experience_level' not in st.session_state: # Store experience from form for consistency
     st.session_state.experience_level = "Student"
 if 'extracted_cv_skills' not in st.session_state: # Store skills extracted from CV specifically
     st.session_state.extracted_cv_skills = ""
 if 'current_skills_for_enhancement_list' not in st.session_state: # List version of skills
     st.session_state.current_skills_for_enhancement_list = []
+if 'cv_digest' not in st.session_state: # Content hash of the CV whose results are in session state
+    st.session_state.cv_digest = None
+if 'cv_plan' not in st.session_state: # How much of the uploaded CV needs the LLM (CareerAdvisor.plan_cv_analysis)
+    st.session_state.cv_plan = None
+if 'cv_profile_status' not in st.session_state: # (mode, unchanged sections, sections) of the last CV, for the sidebar
+    st.session_state.cv_profile_status = None
+if 'profile_id' not in st.session_state: # Stored profile of the analyzed CV; tests are recorded under it
+    st.session_state.profile_id = None
+if 'test_record_id' not in st.session_state: # Test history row waiting for its enhancement strategy
+    st.session_state.test_record_id = None
+if 'pending_career_request' not in st.session_state: # Career request waiting to be streamed into the page
+    st.session_state.pending_career_request = None
+if 'test_percentage' not in st.session_state: # Score the pending enhancement strategy is generated for
+    st.session_state.test_percentage = None
+if 'seen_question_ids' not in st.session_state: # Question bank ids already shown in this session
+    st.session_state.seen_question_ids = set()
+if 'prefetcher' not in st.session_state: # Background learning materials / tests for this session
+    st.session_state.prefetcher = Prefetcher(get_prefetch_executor())
+if 'metrics_timeline' not in st.session_state: # Recent spans of this session, for the developer panel
+    st.session_state.metrics_timeline = deque(maxlen=200)
+
+bind_timeline(st.session_state.metrics_timeline)
+script_started = time.perf_counter()
+
+
+# --- Background work (no st.* calls) ---
+# Background callers pass priority=PREFETCH so the scheduler admits interactive requests first
+def prefetch_enhancement_strategy(skill, experience_level, percentage):
+    return career_advisor.enhancement_strategy(skill, experience_level, percentage, priority=PREFETCH)
+
+
+def prefetch_learning_materials(skill_list, experience_level, shown_skill=None):
+    # Start every listed skill's guide at once; anything queued for a previous list is cancelled.
+    # The guide shown right away (`shown_skill`) is streamed in the main area instead, so its first words
+    # appear without waiting for the whole text.
+    prefetcher = st.session_state.prefetcher
+    prefetcher.cancel_all()
+    for skill in skill_list:
+        if skill == shown_skill:
+            continue
+        prefetcher.submit(("materials", skill, experience_level), career_advisor.learning_materials, skill, experience_level, priority=PREFETCH)
 
 
-# Function to parse questions and options more robustly
-def parse_test_questions(test_content):
-    questions_data = []
-    # Split by "Question X:" or "X." to get individual questions, handling multiple formats
-    raw_questions = re.split(r'(?:Question\s*\d+\s*:|^\d+\.\s)', test_content, flags=re.MULTILINE)
-    for raw_q in raw_questions:
-        raw_q = raw_q.strip()
-        if not raw_q:
-            continue
+# CV ingestion: extraction and compaction run once per distinct document (keyed by content hash).
+# The leading underscore keeps Streamlit from hashing the raw bytes again; the digest already identifies them.
+@st.cache_data(show_spinner=False, max_entries=256)
+def ingest_cv(cv_digest, _file_bytes, file_type):
+    return career_advisor.ingest_cv(_file_bytes, file_type)
 
-        lines = raw_q.split('\n')
-        if not lines:
-            continue
 
-        question_text = lines[0].strip()
-        options = []
-        for line in lines[1:]:
-            line = line.strip()
-            # Ensure options are correctly formatted with A), B), C), D)
-            if re.match(r'^[A-D]\)', line):
-                options.append(line)
-        
-        # Only add question if both text and options are found and exactly 4 options
-        if question_text and options and len(options) == 4:
-            questions_data.append({"question": question_text, "options": options})
-    return questions_data
+def reset_test():
+    # Clears the current test, its results and strategy (the flow's test stage is reset by the caller)
+    st.session_state.test_questions_data = []
+    st.session_state.user_answers = []
+    st.session_state.correct_answers = []
+    st.session_state.artifacts.test_results = None
+    st.session_state.test_percentage = None
+    st.session_state.artifacts.enhancement_strategy = None
+
+
+def rerun_fragment():
+    # Reruns only the calling fragment. A fragment that runs as part of a full script run (the first run after
+    # 'Enhance Skill', or AppTest, which always runs the full script) cannot rerun alone, so the app reruns.
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
 
 # Sidebar setup
 with st.sidebar:
@@ -92,68 +357,68 @@ with st.sidebar:
     st.subheader("Upload Your CV")
     uploaded_file = st.file_uploader("Choose a file (PDF or DOCX)", type=["pdf", "docx"])
     
-    if uploaded_file is not None:
-        # Reset display flags and states relevant to other modes
-        st.session_state.show_manual_suggestions = False
-        st.session_state.show_cv_suggestions = True # Keep CV suggestions visible
-        st.session_state.show_enhance_program = False # Hide enhancement until 'Enhance Skill' is clicked
-        st.session_state.enhance_mode = False # Turn off enhance mode initially
-        st.session_state.test_taken = False
-        st.session_state.test_questions_data = []
-        st.session_state.user_answers = []
-        st.session_state.correct_answers = []
-        st.session_state.show_test = False
-        st.session_state.test_results = None
-        st.session_state.enhancement_strategy = None
-        st.session_state.extracted_cv_skills = "" # Clear previous extracted skills
-
-        with st.spinner("Analyzing your CV..."):
-            try:
-                text = ""
-                if uploaded_file.type == "application/pdf":
-                    pdf_reader = PyPDF2.PdfReader(uploaded_file)
-                    for page in pdf_reader.pages:
-                        text += page.extract_text() or ""
-                elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                    doc = docx.Document(uploaded_file)
-                    text = "\n".join([para.text for para in doc.paragraphs])
-                
-                if not text.strip():
-                    st.warning("No text could be extracted from the document.")
-                else:
-                    # Get career advice based on CV
-                    response = client.chat.completions.create(
-                        model="llama3-70b-8192",
-                        messages=[{
-                            "role": "user",
-                            "content": f"Analyze this CV and suggest 3 detailed career paths:\n{text[:10000]}\n"
-                                       "Format each with:\n"
-                                       "- Title\n- Description\n"
-                                       "- Required Certifications\n"
-                                       "- Average Salary Range\n"
-                                       "- Growth Outlook"
-                        }],
-                        temperature=0.7,
-                        max_tokens=1024
-                    )
-                    st.session_state.cv_analysis = response.choices[0].message.content
-                    st.success("CV analysis complete! You can now use the 'Enhance Skill' feature in the sidebar.")
-                    
-                    # Also, extract skills from CV analysis immediately for later use
-                    skill_response = client.chat.completions.create(
-                        model="llama3-70b-8192",
-                        messages=[{
-                            "role": "user",
-                            "content": f"From the following career analysis, extract a list of 3-5 key technical skills mentioned as 'Required Certifications' or skills implied as necessary for career growth. List them separated by commas. If no specific technical skills are mentioned, infer some general technical skills from the career paths (e.g., 'Python Programming', 'Data Analysis', 'Cloud Computing'). Do not include introductory phrases, just the comma-separated skills."
-                                       f"\n\n{st.session_state.cv_analysis}"
-                        }],
-                        temperature=0.3,
-                        max_tokens=200
-                    )
-                    st.session_state.extracted_cv_skills = re.sub(r'^(Skills:|Suggested skills:|Key technical skills:|Technical skills to enhance:)\s*', '', skill_response.choices[0].message.content, flags=re.IGNORECASE).strip()
+    if uploaded_file is None:
+        st.session_state.cv_digest = None # A re-attached file is ingested again (served from cache)
+    else:
+        file_bytes = uploaded_file.getvalue()
+        cv_digest = document_digest(file_bytes)
+
+        # Only a new document resets downstream state; reruns with the same upload reuse the results
+        if cv_digest != st.session_state.cv_digest:
+            st.session_state.flow.dispatch("cv_uploaded") # Show CV suggestions; enhancement waits for 'Enhance Skill'
+            reset_test()
+            st.session_state.artifacts.cv_analysis = None
+            st.session_state.artifacts.cv_text = None
+            st.session_state.extracted_cv_skills = "" # Clear previous extracted skills
+            st.session_state.cv_plan = None
+            st.session_state.cv_profile_status = None
+            st.session_state.prefetcher.cancel_all()
+
+            with st.spinner("Reading your CV..."):
+                try:
+                    compaction = ingest_cv(cv_digest, file_bytes, uploaded_file.type)
+                    st.session_state.cv_digest = cv_digest
+                    # Only the counters are kept; the text is an artifact and the sections go into the plan
+                    st.session_state.cv_compaction = {k: v for k, v in compaction.items() if k not in ("text", "section_texts")}
+
+                    if not compaction["text"].strip():
+                        st.warning("No text could be extracted from the document.")
+                    else:
+                        st.session_state.artifacts.cv_text = compaction["text"] # Analyzed (and streamed) in the main area below
+                        plan = career_advisor.plan_cv_analysis(compaction)
+                        st.session_state.cv_plan = plan
+                        st.session_state.profile_id = plan["profile_id"]
+                        st.session_state.cv_profile_status = (
+                            plan["mode"], len(plan["diff"]["unchanged"]) if plan["diff"] else 0, len(plan["section_texts"])
+                        )
 
-            except Exception as e:
-                st.error(f"Error processing CV: {str(e)}")
+                except Exception as e:
+                    st.error(f"Error processing CV: {str(e)}")
+
+        compaction = st.session_state.get('cv_compaction')
+        if st.session_state.cv_digest and compaction and compaction["original_tokens"]:
+            st.caption(
+                f"CV compacted to ~{compaction['compact_tokens']} of {compaction['original_tokens']} tokens "
+                f"({compaction['compression_ratio']:.0%}) for analysis."
+            )
+        profile_status = st.session_state.cv_profile_status
+        if st.session_state.cv_digest and profile_status and profile_status[0] != "full":
+            mode, unchanged, total = profile_status
+            st.caption(
+                f"Welcome back: {unchanged} of {total} CV sections are unchanged"
+                + ("; your previous analysis is reused." if mode == "reuse" else "; only the changes are re-analyzed.")
+            )
+
+    # Test history of the returning user's profile
+    if st.session_state.profile_id and profile_store is not None:
+        test_history = profile_store.test_history(st.session_state.profile_id)
+        if test_history:
+            with st.expander("Your Test History"):
+                for test in test_history:
+                    st.write(
+                        f"{time.strftime('%Y-%m-%d', time.localtime(test['taken_at']))}: {test['skill']} ({test['level']}) "
+                        f"- {test['score']}/{test['total']} ({test['percentage']:.0f}%)"
+                    )
     
     # Skill Enhancement Section
     st.subheader("Enhance Your Skills")
@@ -161,21 +426,12 @@ with st.sidebar:
     
     if enhance_skill_button:
         # Check if either CV analysis has happened OR manual skills are entered
-        if st.session_state.cv_analysis or (st.session_state.get('skills') and st.session_state.skills.strip()):
-            st.session_state.enhance_mode = True
-            st.session_state.show_enhance_program = True # Show skill enhancement section
-            st.session_state.show_manual_suggestions = False # Hide other suggestions
-            st.session_state.show_cv_suggestions = False # Hide other suggestions
-            st.session_state.test_taken = False # Reset test state for new enhancement session
-            st.session_state.test_questions_data = [] # Clear previous test questions
-            st.session_state.user_answers = []
-            st.session_state.correct_answers = []
-            st.session_state.show_test = False # Ensure test is not shown initially
-            st.session_state.test_results = None
-            st.session_state.enhancement_strategy = None
+        if st.session_state.artifacts.cv_analysis or (st.session_state.get('skills') and st.session_state.skills.strip()):
+            st.session_state.flow.dispatch("enhance_requested") # Show the enhancement program with a fresh test
+            reset_test()
             
             # DETERMINE SKILLS FOR ENHANCEMENT *IMMEDIATELY* AFTER BUTTON CLICK
-            if st.session_state.cv_analysis and st.session_state.extracted_cv_skills:
+            if st.session_state.artifacts.cv_analysis and st.session_state.extracted_cv_skills:
                 st.session_state.current_skills_for_enhancement_list = [s.strip() for s in st.session_state.extracted_cv_skills.split(',') if s.strip()]
             elif st.session_state.get('skills') and st.session_state.skills.strip():
                 st.session_state.current_skills_for_enhancement_list = [s.strip() for s in st.session_state.skills.split(',') if s.strip()]
@@ -186,12 +442,11 @@ with st.sidebar:
                 # Set a default selected skill if not already set or not in the new list
                 if st.session_state.selected_skill not in st.session_state.current_skills_for_enhancement_list:
                     st.session_state.selected_skill = st.session_state.current_skills_for_enhancement_list[0]
+                prefetch_learning_materials(st.session_state.current_skills_for_enhancement_list, st.session_state.get('experience_level', 'Student'), shown_skill=st.session_state.selected_skill)
             else:
                 st.warning("No skills found to enhance. Please upload your CV or enter your skills in the main form.")
-                st.session_state.show_enhance_program = False
-                st.session_state.enhance_mode = False
-            
-            st.rerun() # Rerun to display the enhancement program with correct skills and selected skill
+                st.session_state.flow.dispatch("enhance_unavailable")
+            # No rerun needed: the main area below is rendered after the sidebar in this same run
         else:
             st.warning("Please first get career suggestions (by entering skills/interests) or upload your CV to enable skill enhancement.")
 
@@ -215,72 +470,79 @@ if submitted:
     if not all([skills_input.strip(), interests.strip()]):
         st.error("Please fill in your skills and interests.")
     else:
-        # Reset display flags
-        st.session_state.show_manual_suggestions = True
-        st.session_state.show_cv_suggestions = False # IMPORTANT: Hide CV suggestions
-        st.session_state.show_enhance_program = False
-        st.session_state.enhance_mode = False # Turn off enhance mode
-        st.session_state.test_taken = False
-        st.session_state.cv_analysis = None # IMPORTANT: Clear CV analysis results
+        st.session_state.flow.dispatch("career_requested") # Show manual suggestions, hide CV suggestions and enhancement
+        reset_test()
+        st.session_state.artifacts.cv_analysis = None # IMPORTANT: Clear CV analysis results
+        st.session_state.artifacts.cv_text = None
         st.session_state.extracted_cv_skills = "" # Clear extracted CV skills
-        st.session_state.show_test = False
-        st.session_state.test_results = None
-        st.session_state.enhancement_strategy = None
+        st.session_state.profile_id = None # Tests on manually entered skills are not recorded under a CV profile
+        
+        st.session_state.prefetcher.cancel_all()
         
         st.session_state.skills = skills_input # Store skills for potential enhancement
         st.session_state.experience_level = experience # Store experience for consistent enhancement advice
 
-        with st.spinner("Generating career paths..."):
-            try:
-                response = client.chat.completions.create(
-                    model="llama3-70b-8192",
-                    messages=[{
-                        "role": "user",
-                        "content": f"Suggest 3 detailed career paths for:\n"
-                                   f"Skills: {st.session_state.skills}\nInterests: {interests}\n" # Use session state skills
-                                   f"Experience: {experience}\n"
-                                   "Format each with:\n"
-                                   "- Title\n- Description\n"
-                                   "- Required Certifications\n"
-                                   "- Average Salary Range\n"
-                                   "- Growth Outlook"
-                    }],
-                    temperature=0.7,
-                    max_tokens=1024
-                )
-
-                st.session_state.career_suggestions = response.choices[0].message.content
-                st.success("Career suggestions generated! You can now use the 'Enhance Skill' feature.")
-                
-            except Exception as e:
-                st.error(f"Error communicating with Groq API: {str(e)}")
+        st.session_state.artifacts.career_suggestions = None
+        st.session_state.pending_career_request = (st.session_state.skills, interests, experience) # Use session state skills
 
 # Display career suggestions based on manual input
-if st.session_state.show_manual_suggestions and st.session_state.career_suggestions:
+if st.session_state.flow.view == "manual" and (st.session_state.artifacts.career_suggestions or st.session_state.pending_career_request):
     st.markdown("---")
     st.subheader("Recommended Career Paths (Based on Manual Input)")
-    st.write(st.session_state.career_suggestions)
+    if st.session_state.pending_career_request:
+        try:
+            st.session_state.artifacts.career_suggestions = render_completion(
+                functools.partial(career_advisor.career_paths, *st.session_state.pending_career_request),
+                spinner_text="Generating career paths..."
+            )
+            st.success("Career suggestions generated! You can now use the 'Enhance Skill' feature.")
+        except Exception as e:
+            st.error(f"Error communicating with Groq API: {str(e)}")
+        st.session_state.pending_career_request = None
+    else:
+        st.write(st.session_state.artifacts.career_suggestions)
 
 # Display career suggestions based on CV analysis
-if st.session_state.show_cv_suggestions and st.session_state.cv_analysis:
+if st.session_state.flow.view == "cv" and (st.session_state.artifacts.cv_analysis or st.session_state.artifacts.cv_text):
     st.markdown("---")
     st.subheader("Career Suggestions Based on Your CV")
-    st.write(st.session_state.cv_analysis)
+    if st.session_state.artifacts.cv_analysis is None:
+        try:
+            # Get career advice based on CV
+            # A returning user's unchanged CV is served from their profile; an edited one only sends the changed sections
+            plan = st.session_state.cv_plan
+            st.session_state.artifacts.cv_analysis = render_completion(
+                functools.partial(career_advisor.analyze_cv_incremental, plan, st.session_state.artifacts.cv_text),
+                spinner_text="Analyzing your CV..."
+            )
+            with st.spinner("Extracting key skills..."):
+                st.session_state.extracted_cv_skills = career_advisor.extract_skills_incremental(plan, st.session_state.artifacts.cv_analysis, st.session_state.artifacts.cv_text)
+            st.session_state.profile_id = career_advisor.save_cv_profile(
+                plan, st.session_state.cv_digest, st.session_state.artifacts.cv_analysis, st.session_state.extracted_cv_skills
+            )
+            st.success("CV analysis complete! You can now use the 'Enhance Skill' feature in the sidebar.")
+        except Exception as e:
+            st.error(f"Error processing CV: {str(e)}")
+        st.session_state.artifacts.cv_text = None
+        st.session_state.cv_plan = None
+    else:
+        st.write(st.session_state.artifacts.cv_analysis)
 
-# Skill Enhancement Flow
-if st.session_state.enhance_mode and st.session_state.show_enhance_program:
-    st.markdown("---")
-    st.subheader("Skill Enhancement Program")
 
-    # Use the pre-determined skill list
-    skill_list = st.session_state.current_skills_for_enhancement_list
+# Skill Enhancement Flow
+# The program and the test are fragments: picking another skill reruns only the program, and taking,
+# submitting or retaking a test reruns only the assessment, instead of the whole page above them.
+@st.fragment
+def enhancement_program():
+    # A fragment rerun runs in a fresh script thread without the context bound at the top of the script
+    bind_timeline(st.session_state.metrics_timeline)
+    with metrics.span("enhancement_program_run"):
+        st.markdown("---")
+        st.subheader("Skill Enhancement Program")
+
+        # Use the pre-determined skill list (never empty here: 'Enhance Skill' dispatches enhance_unavailable instead)
+        skill_list = st.session_state.current_skills_for_enhancement_list
 
-    if not skill_list:
-        st.warning("No skills found to enhance. Please ensure your CV was analyzed or you entered skills.")
-        st.session_state.show_enhance_program = False
-        st.session_state.enhance_mode = False
-        # Remove the stop() here to allow the warning to be displayed without blocking
-    else:
         st.write("Suggested skills to enhance:")
         st.write(", ".join(skill_list)) # Display as comma separated string
 
@@ -294,198 +556,202 @@ if st.session_state.enhance_mode and st.session_state.show_enhance_program:
         # Determine experience level for learning materials and test
         effective_experience_level = st.session_state.get('experience_level', 'Student') 
 
-        if selected_skill:
-            # Generate learning materials only once per skill selection or on initial load
-            if 'learning_materials' not in st.session_state or st.session_state.get('last_selected_skill_for_materials') != selected_skill:
+        st.markdown("### Learning Materials")
+        # Generate learning materials only once per skill selection or on initial load
+        if st.session_state.artifacts.learning_materials is None or st.session_state.get('last_selected_skill_for_materials') != selected_skill:
+            materials_key = ("materials", selected_skill, effective_experience_level)
+            learning_materials = None
+            if st.session_state.prefetcher.has(materials_key):
                 with st.spinner(f"Preparing {selected_skill} learning materials..."):
-                    materials_response = client.chat.completions.create(
-                        model="llama3-70b-8192",
-                        messages=[{
-                            "role": "user",
-                            "content": f"Create a beginner-friendly learning guide for {selected_skill} suitable for a {effective_experience_level} level individual. "
-                                       "Include:\n"
-                                       "1. Key concepts (bullet points)\n"
-                                       "2. Recommended free online resources (actual URLs if possible, otherwise generic types like 'Coursera course', 'YouTube tutorial series')\n"
-                                       "3. A practical 2-week study plan (1 hour daily, detailing topics for each day)\n"
-                                       "4. Expected outcomes after completing this guide."
-                        }],
-                        temperature=0.5,
-                        max_tokens=1024
-                    )
-                    st.session_state.learning_materials = materials_response.choices[0].message.content
-                    st.session_state.last_selected_skill_for_materials = selected_skill # Store the last selected skill for materials
-            
-            st.markdown("### Learning Materials")
-            st.write(st.session_state.learning_materials)
-            
-            # --- Test Section ---
-            # Show "Take Test" button only if test hasn't been taken and not already showing a test
-            if not st.session_state.test_taken and not st.session_state.show_test:
-                if st.button("Take Test"):
-                    with st.spinner("Generating test questions..."):
-                        test_response = client.chat.completions.create(
-                            model="llama3-70b-8192",
-                            messages=[{
-                                "role": "user",
-                                "content": f"Create a 5-question multiple choice test about {selected_skill} at {effective_experience_level} level. "
-                                           "Each question should have a question number (e.g., 'Question 1:'), the question text, and exactly 4 options (A), B), C), D)) on separate lines. "
-                                           "Ensure there's a blank line between each question and its options. "
-                                           "Provide the correct answers at the very end, each on a new line, prefixed with 'Correct Answer ' followed by the question number and the correct option (e.g., 'Correct Answer 1: A', 'Correct Answer 2: B'). "
-                                           "Do NOT show correct answers within the questions or options."
-                            }],
-                            temperature=0.3,
-                            max_tokens=1024
-                        )
-                        test_content = test_response.choices[0].message.content
-                        
-                        # Split questions from correct answers using regex for robustness
-                        parts = re.split(r'(Correct Answer \d+: [A-D])', test_content)
-                        raw_questions_part = ""
-                        raw_correct_answers_part = ""
-
-                        # Reconstruct parts more carefully
-                        for i, part in enumerate(parts):
-                            if re.match(r'Correct Answer \d+: [A-D]', part):
-                                raw_correct_answers_part += part.strip() + "\n"
-                            else:
-                                raw_questions_part += part.strip() + "\n"
-
-                        if not raw_questions_part.strip() or not raw_correct_answers_part.strip():
-                             st.error("Could not parse test questions or correct answers properly. Please try again.")
-                             st.session_state.test_taken = False
-                             st.session_state.show_test = False
-                             # st.stop() # Removed st.stop() to allow error message to be displayed without blocking
-                             st.rerun() # Rerun to try generating again
-                        
-                        st.session_state.test_questions_data = parse_test_questions(raw_questions_part)
-                        
-                        # Parse correct answers robustly
-                        st.session_state.correct_answers = []
-                        for line in raw_correct_answers_part.split('\n'):
-                            match = re.search(r'Correct Answer \d+: ([A-D])', line)
-                            if match:
-                                st.session_state.correct_answers.append(match.group(1))
-                        
-                        # Validate that we have 5 questions and 5 answers
-                        if len(st.session_state.test_questions_data) != 5 or len(st.session_state.correct_answers) != 5:
-                            st.warning(f"Generated {len(st.session_state.test_questions_data)} questions and {len(st.session_state.correct_answers)} answers. Expected 5. Please click 'Take Test' again.")
-                            st.session_state.test_taken = False
-                            st.session_state.show_test = False # Keep button visible
-                            st.session_state.test_questions_data = [] # Clear so it tries again
-                            st.session_state.correct_answers = []
-                            # No rerun here, let user click again
-                            
-                        else:
-                            # Ensure user_answers list is correctly sized and initialized to None
-                            st.session_state.user_answers = [None] * len(st.session_state.test_questions_data)
-                            st.session_state.show_test = True
-                            st.rerun() # Rerun to display the test questions immediately
-            
-            # Display test if show_test flag is true and test hasn't been taken yet
-            if st.session_state.show_test and not st.session_state.test_taken:
-                st.markdown("### Skill Assessment Test")
+                    learning_materials = st.session_state.prefetcher.result(materials_key)
+            if learning_materials:
+                st.write(learning_materials)
+            else: # Not prefetched (or the prefetch failed), generate it here
+                learning_materials = render_completion(
+                    functools.partial(career_advisor.learning_materials, selected_skill, effective_experience_level),
+                    spinner_text=f"Preparing {selected_skill} learning materials..."
+                )
+            st.session_state.artifacts.learning_materials = learning_materials
+            st.session_state.last_selected_skill_for_materials = selected_skill # Store the last selected skill for materials
+        else:
+            st.write(st.session_state.artifacts.learning_materials)
+
+    skill_assessment(selected_skill, effective_experience_level)
+
+
+@st.fragment
+def skill_assessment(selected_skill, effective_experience_level):
+    bind_timeline(st.session_state.metrics_timeline) # See enhancement_program
+    flow = st.session_state.flow
+    with metrics.span("skill_assessment_run", test_stage=flow.test_stage):
+        # --- Test Section ---
+        if flow.test_stage == "idle":
+            # Top up the question bank in the background while the user reads the materials
+            test_key = ("test", selected_skill, effective_experience_level)
+            seen_question_ids = frozenset(st.session_state.seen_question_ids)
+            st.session_state.prefetcher.submit(test_key, career_advisor.top_up_question_bank, selected_skill, effective_experience_level, seen_question_ids, priority=PREFETCH)
+
+            if st.button("Take Test"):
+                with st.spinner("Generating test questions..."):
+                    st.session_state.prefetcher.result(test_key, pop=True)
+                    if question_bank.available(selected_skill, effective_experience_level, seen_question_ids) < 5:
+                        try:
+                            career_advisor.top_up_question_bank(selected_skill, effective_experience_level, seen_question_ids, min_available=5)
+                        except Exception as e:
+                            st.error(f"Error communicating with Groq API: {str(e)}")
+                    bank_questions = question_bank.sample(selected_skill, effective_experience_level, 5, seen_question_ids)
+
+                if not bank_questions:
+                    st.error("Could not parse test questions or correct answers properly. Please try again.")
                 
-                if st.session_state.test_questions_data:
-                    with st.form("skill_test_form"):
-                        # We need to capture current selections for submission
-                        temp_user_answers = list(st.session_state.user_answers) # Copy to allow local modification
-
-                        for i, q_data in enumerate(st.session_state.test_questions_data):
-                            st.markdown(f"**Question {i+1}:** {q_data['question']}")
-                            
-                            # Use a unique key for each radio button
-                            selected_option_index = None
-                            if temp_user_answers[i] is not None:
-                                try:
-                                    selected_option_index = q_data['options'].index(temp_user_answers[i])
-                                except ValueError: # In case the options change on rerun (unlikely but safe)
-                                    selected_option_index = None
-
-                            temp_user_answers[i] = st.radio(
-                                f"Select answer for Question {i+1}:",
-                                q_data['options'],
-                                key=f"q_{i}_radio",
-                                index=selected_option_index # Pre-select if previously answered
-                            )
-                        
-                        submit_test_button = st.form_submit_button("Submit Test")
-
-                        if submit_test_button:
-                            st.session_state.user_answers = temp_user_answers # Update session state with final selections
-
-                            if None in st.session_state.user_answers:
-                                st.warning("Please answer all questions before submitting.")
-                            else:
-                                # Calculate score
-                                score = 0
-                                for i in range(len(st.session_state.test_questions_data)):
-                                    if i < len(st.session_state.user_answers) and i < len(st.session_state.correct_answers):
-                                        user_selected_option_char = st.session_state.user_answers[i][0] if st.session_state.user_answers[i] else ""
-                                        if user_selected_option_char == st.session_state.correct_answers[i]:
-                                            score += 1
-                                
-                                total_questions = len(st.session_state.test_questions_data)
-                                percentage = (score / total_questions) * 100 if total_questions > 0 else 0
-                                
-                                st.session_state.test_results = (
-                                    f"### Test Results\n"
-                                    f"- **Score:** {score}/{total_questions}\n"
-                                    f"- **Percentage:** {percentage:.0f}%\n"
-                                )
-                                # Generate enhancement strategy based on results and selected skill
-                                with st.spinner("Generating personalized enhancement strategy..."):
-                                    enhancement_prompt = f"Based on a test score of {percentage:.0f}% in {selected_skill} for a {effective_experience_level} level, provide a detailed strategy for improvement. " \
-                                                        "Include:\n" \
-                                                        "1. Key areas to focus on (specific concepts based on the skill)\n" \
-                                                        "2. Suggested learning activities (e.g., practice problems, projects, advanced readings)\n" \
-                                                        "3. A recommended study time commitment per day/week (e.g., 'Dedicate 1-2 hours daily for the next 3 weeks')\n" \
-                                                        "4. A few advanced resources or next steps for continued learning (e.g., specific books, online courses, certifications).\n" \
-                                                        "5. A concluding message encouraging the user to continue enhancing their skill."
-
-                                    strategy_response = client.chat.completions.create(
-                                        model="llama3-70b-8192",
-                                        messages=[{"role": "user", "content": enhancement_prompt}],
-                                        temperature=0.6,
-                                        max_tokens=1024
-                                    )
-                                    st.session_state.enhancement_strategy = strategy_response.choices[0].message.content
-
-                                st.session_state.test_taken = True # Mark test as taken
-                                st.session_state.show_test = False # Hide the test form
-                                st.rerun() # Rerun to display results and strategy
+                # Validate that we have 5 questions
+                elif len(bank_questions) != 5:
+                    st.warning(f"Only {len(bank_questions)} questions are available for {selected_skill} so far. Expected 5. Please click 'Take Test' again.")
+                    # No rerun here, let user click again
+                    
                 else:
-                    st.warning("No test questions available. Please click 'Take Test' to generate them.")
-                        
-            if st.session_state.test_results and st.session_state.test_taken:
-                st.markdown(st.session_state.test_results)
-                st.write("After the test assessment, we have a plan to enhance your skill. If you want to continue improving, click on the 'Enhance Skill' button in the sidebar.")
+                    st.session_state.test_questions_data = [{"question": q["question"], "options": q["options"]} for q in bank_questions]
+                    st.session_state.correct_answers = [q["answer"] for q in bank_questions]
+                    st.session_state.seen_question_ids.update(q["id"] for q in bank_questions)
+                    # Ensure user_answers list is correctly sized and initialized to None
+                    st.session_state.user_answers = [None] * len(st.session_state.test_questions_data)
+                    flow.dispatch("test_started")
+                    # Fill every possible score's strategy while the user answers the questions
+                    strategy_store.warm(get_prefetch_executor(), prefetch_enhancement_strategy, selected_skill, effective_experience_level)
+                    rerun_fragment() # Rerun to display the test questions immediately
+        
+        elif flow.test_stage == "testing":
+            st.markdown("### Skill Assessment Test")
+            
+            # Radio clicks inside the form do not rerun anything; only 'Submit Test' does
+            with st.form("skill_test_form"):
+                # We need to capture current selections for submission
+                temp_user_answers = list(st.session_state.user_answers) # Copy to allow local modification
+
+                for i, q_data in enumerate(st.session_state.test_questions_data):
+                    st.markdown(f"**Question {i+1}:** {q_data['question']}")
+                    
+                    # Use a unique key for each radio button
+                    selected_option_index = None
+                    if temp_user_answers[i] is not None:
+                        try:
+                            selected_option_index = q_data['options'].index(temp_user_answers[i])
+                        except ValueError: # In case the options change on rerun (unlikely but safe)
+                            selected_option_index = None
+
+                    temp_user_answers[i] = st.radio(
+                        f"Select answer for Question {i+1}:",
+                        q_data['options'],
+                        key=f"q_{i}_radio",
+                        index=selected_option_index # Pre-select if previously answered
+                    )
                 
-                if st.session_state.enhancement_strategy:
-                    st.markdown("### Personalized Enhancement Strategy")
-                    st.write(st.session_state.enhancement_strategy)
-
-                # Reset for new skill or re-take test
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.button("Retake Test for This Skill"):
-                        st.session_state.test_taken = False
-                        st.session_state.show_test = False # Allow test button to reappear
-                        st.session_state.test_results = None
-                        st.session_state.enhancement_strategy = None
-                        st.session_state.user_answers = [] # Clear previous answers
-                        st.session_state.test_questions_data = [] # Clear test questions so it regenerates
-                        st.rerun()
-                with col2:
-                    if st.button("Enhance Another Skill"):
-                        st.session_state.test_taken = False
-                        st.session_state.enhance_mode = True # Keep enhance mode on
-                        st.session_state.show_enhance_program = True # Keep this section visible
-                        st.session_state.test_results = None # Clear previous results
-                        st.session_state.enhancement_strategy = None
-                        st.session_state.test_questions_data = [] # Clear test questions
-                        st.session_state.user_answers = [] # Clear user answers
-                        st.session_state.correct_answers = [] # Clear correct answers
-                        st.session_state.show_test = False # Hide the test form
-                        st.rerun()
-    # else: # Removed this else block, as the outer 'if not skill_list' handles this case
-    #    st.warning("No skills found to enhance. Please upload your CV or enter your skills.")
+                submit_test_button = st.form_submit_button("Submit Test")
+
+                if submit_test_button:
+                    st.session_state.user_answers = temp_user_answers # Update session state with final selections
+
+                    if None in st.session_state.user_answers:
+                        st.warning("Please answer all questions before submitting.")
+                    else:
+                        # Calculate score
+                        result = score_test(st.session_state.user_answers, st.session_state.correct_answers)
+                        score, total_questions, percentage = result["score"], result["total"], result["percentage"]
+                        
+                        st.session_state.artifacts.test_results = (
+                            f"### Test Results\n"
+                            f"- **Score:** {score}/{total_questions}\n"
+                            f"- **Percentage:** {percentage:.0f}%\n"
+                        )
+                        # The enhancement strategy is generated (and streamed) below the results after the rerun
+                        st.session_state.test_percentage = percentage
+                        if st.session_state.profile_id and profile_store is not None:
+                            st.session_state.test_record_id = profile_store.record_test(
+                                st.session_state.profile_id, selected_skill, effective_experience_level, score, total_questions, percentage
+                            )
+                        st.session_state.artifacts.enhancement_strategy = None
+
+                        flow.dispatch("test_submitted")
+                        rerun_fragment() # Rerun to display results and strategy
+                    
+        else: # results
+            st.markdown(st.session_state.artifacts.test_results)
+            st.write("After the test assessment, we have a plan to enhance your skill. If you want to continue improving, click on the 'Enhance Skill' button in the sidebar.")
+            
+            if st.session_state.artifacts.enhancement_strategy:
+                st.markdown("### Personalized Enhancement Strategy")
+                st.write(st.session_state.artifacts.enhancement_strategy)
+            elif st.session_state.test_percentage is not None:
+                st.markdown("### Personalized Enhancement Strategy")
+                percentage = st.session_state.test_percentage
+                # Precomputed strategies are shown instantly; a bucket still being warmed is awaited. pending() is
+                # read first: a warm stores its result before leaving pending, so get() then cannot miss it.
+                pending_strategy = strategy_store.pending(selected_skill, effective_experience_level, percentage)
+                strategy = strategy_store.get(selected_skill, effective_experience_level, percentage)
+                if strategy is None and pending_strategy is not None:
+                    with st.spinner("Generating personalized enhancement strategy..."):
+                        try:
+                            strategy = pending_strategy.result()
+                        except Exception:
+                            strategy = None
+                try:
+                    if strategy:
+                        st.write(strategy)
+                    else: # Generate enhancement strategy based on results and selected skill
+                        strategy = render_completion(
+                            functools.partial(career_advisor.enhancement_strategy, selected_skill, effective_experience_level, percentage),
+                            spinner_text="Generating personalized enhancement strategy..."
+                        )
+                        strategy_store.put(selected_skill, effective_experience_level, percentage, strategy)
+                    st.session_state.artifacts.enhancement_strategy = strategy
+                    if st.session_state.test_record_id is not None:
+                        profile_store.set_test_strategy(st.session_state.test_record_id, strategy)
+                        st.session_state.test_record_id = None
+                except Exception as e:
+                    st.error(f"Error communicating with Groq API: {str(e)}")
+                st.session_state.test_percentage = None
+
+            # Reset for new skill or re-take test (the skill selectbox above stays where it is)
+            col1, col2 = st.columns(2)
+            with col1:
+                retake = st.button("Retake Test for This Skill")
+            with col2:
+                another = st.button("Enhance Another Skill")
+            if retake or another:
+                reset_test()
+                flow.dispatch("test_reset")
+                rerun_fragment()
+
+
+if st.session_state.flow.view == "enhance":
+    enhancement_program()
+
+# Reruns cut short by st.rerun() are not recorded; the run they trigger is. Fragment-only reruns are
+# recorded as enhancement_program_run / skill_assessment_run spans instead.
+metrics.record("script_run", time.perf_counter() - script_started)
+
+# Developer panel: this session's timeline and the process-wide counters
+if DEV_PANEL:
+    with st.sidebar.expander("Developer metrics"):
+        timeline = list(st.session_state.metrics_timeline)
+        llm_events = [event for event in timeline if event["name"].startswith("llm ")]
+        cache_stats = completion_cache.stats()
+        st.caption(
+            f"This session: {len(llm_events)} LLM calls, {sum(e['tokens'] for e in llm_events)} tokens, "
+            f"~${sum(e['cost_usd'] for e in llm_events):.4f}. "
+            f"Cache hit rate {cache_stats['hit_rate']:.0%}, test parse failure rate {parse_stats.snapshot()['failure_rate']:.0%}."
+        )
+        store_stats = artifact_store.stats()
+        st.caption(
+            f"Artifacts: this session references {st.session_state.artifacts.memory_bytes() / 1024:.1f} KiB; "
+            f"the shared store holds {store_stats['bytes'] / 1024:.1f} KiB in {store_stats['entries']} texts for "
+            f"{store_stats['sessions']} sessions ({store_stats['saved_bytes'] / 1024:.1f} KiB saved by sharing)."
+        )
+        st.dataframe(
+            [
+                {"time": time.strftime("%H:%M:%S", time.localtime(event["at"])), **{k: v for k, v in event.items() if k != "at"}}
+                for event in reversed(timeline)
+            ],
+            hide_index=True,
+        )
+        st.download_button("Download Prometheus metrics", metrics.prometheus_text(), file_name="advisor_metrics.prom")
@@ -0,0 +1,418 @@
+# Drives the app.py flows for N concurrent simulated sessions against the mock Groq server, offline:
+#   python -m bench.load_test --sessions 20 --latency 0.3 --cv sample_cv.docx --json results.json
+#   python -m bench.load_test --sessions 20 --baseline results.json   # exit code 1 on a regression
+# Each session is a Streamlit AppTest of app.py in this process, so all sessions share the server-side resources
+# (client pool, scheduler, caches, stores) exactly as browser sessions of one `streamlit run` process would.
+# Script runs of different sessions overlap like concurrent browser sessions: the process globals AppTest would
+# swap around every run (mock runtime, config, secrets) are installed once for the whole test instead.
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from advisor.resources import registry
+from bench.mock_groq import MockGroqServer
+
+# shared_app_runtime and ConcurrentAppTest re-implement AppTest._run on Streamlit internals; they were checked
+# against these minor versions, and any other version must be checked (and added here) before the numbers are trusted
+TESTED_STREAMLIT_VERSIONS = ("1.65",)
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+UPLOAD_TYPES = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else None
+
+
+def deep_sizeof(obj, seen=None):
+    # Bytes held by a session_state value: builtin containers are followed, any other object counts shallowly
+    # (e.g. the Prefetcher handle, whose executor is shared by every session)
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    return size
+
+
+class _Upload:
+    # What st.file_uploader returns, for the parts app.py uses
+    def __init__(self, name, data):
+        self.name = name
+        self.type = UPLOAD_TYPES[os.path.splitext(name)[1].lower()]
+        self._data = data
+
+    def getvalue(self):
+        return self._data
+
+
+def install_upload_hook():
+    """Let a session "attach" a CV by setting session_state["_bench_cv"] = (name, bytes).
+
+    AppTest cannot drive st.file_uploader, so the widget is wrapped to return the attached file.
+    """
+    import streamlit as st
+
+    original = st.file_uploader
+
+    def file_uploader(*args, **kwargs):
+        result = original(*args, **kwargs)
+        attached = st.session_state.get("_bench_cv")
+        return _Upload(*attached) if attached else result
+
+    st.file_uploader = file_uploader
+
+
+def install_secrets(secrets):
+    """Serve `secrets` as st.secrets for every session.
+
+    AppTest.secrets swaps the global st.secrets around each run and restores it afterwards,
+    which races when sessions run concurrently; one shared object avoids the swap entirely.
+    """
+    import streamlit as st
+    from streamlit.runtime.secrets import Secrets
+
+    shared = Secrets()
+    shared._secrets = dict(secrets)
+    st.secrets = shared
+
+
+def streamlit_version_problem():
+    import streamlit
+
+    minor = ".".join(streamlit.__version__.split(".")[:2])
+    if minor not in TESTED_STREAMLIT_VERSIONS:
+        return (
+            f"streamlit {streamlit.__version__} is untested with this harness (tested: {', '.join(TESTED_STREAMLIT_VERSIONS)}); "
+            "compare ConcurrentAppTest._run with AppTest._run of this version and update TESTED_STREAMLIT_VERSIONS"
+        )
+    return None
+
+
+@contextlib.contextmanager
+def shared_app_runtime():
+    """Install one mock Streamlit runtime and the appTest config option for every session's script runs.
+
+    AppTest sets both up before each run and tears them down after it, so a session finishing its
+    run would pull the runtime from under another one still running. Yields the ScriptCache the
+    sessions share, as under `streamlit run`, so the page script is compiled once.
+    """
+    from unittest.mock import MagicMock
+
+    from streamlit.components.v2.component_manager import BidiComponentManager
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.dataframe_source_manager import DataframeSourceManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1.util import patch_config_options
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.dataframe_source_mgr = DataframeSourceManager()
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    runtime.bidi_component_registry = BidiComponentManager()
+    runtime.bidi_component_registry.discover_and_register_components(start_file_watching=False)
+    Runtime._instance = runtime
+    try:
+        with patch_config_options({"global.appTest": True}):
+            yield ScriptCache()
+    finally:
+        Runtime._instance = None
+
+
+def _concurrent_app_test(path, timeout, script_cache):
+    """An AppTest of `path` whose runs use the globals installed by shared_app_runtime and install_secrets."""
+    from streamlit.runtime.pages_manager import PagesManager
+    from streamlit.runtime.state import SCRIPT_RUN_WITHOUT_ERRORS_KEY
+    from streamlit.testing.v1 import AppTest
+    from streamlit.testing.v1.app_test import _query_params_from_query_string
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    class ConcurrentAppTest(AppTest):
+        # AppTest._run without the per-run setup and teardown of process globals
+        def _run(self, widget_state=None, timeout=None):
+            pages_manager = PagesManager(self._script_path, script_cache, setup_watcher=False)
+            script_runner = LocalScriptRunner(
+                self._script_path, self._session_state, pages_manager,
+                args=self.args, kwargs=self.kwargs, fragment_storage=self._fragment_storage,
+            )
+            script_runner._script_cache = script_cache  # LocalScriptRunner always makes its own
+            self._register_uploaded_files(script_runner)
+            self._tree = script_runner.run(
+                widget_state, self.query_params, self.default_timeout if timeout is None else timeout, self._page_hash
+            )
+            self._tree._runner = self
+            new_pages = pages_manager.get_pages()
+            if any("url_pathname" in info for info in new_pages.values()) or self.session_state[SCRIPT_RUN_WITHOUT_ERRORS_KEY]:
+                self._registered_pages = new_pages
+            # The last event is SHUTDOWN, whose client state carries the query string
+            self.query_params = _query_params_from_query_string(script_runner.event_data[-1]["client_state"].query_string)
+            return self
+
+    return ConcurrentAppTest(path, default_timeout=timeout)  # AppTest.from_file always builds a plain AppTest
+
+
+class Session:
+    """One simulated user; `act` runs a step and records its latency and the upstream calls it caused."""
+
+    def __init__(self, index, timeout, script_cache):
+        self.index = index
+        self.at = _concurrent_app_test(APP_PATH, timeout, script_cache)
+        self.actions = []
+
+    def _llm_events(self):
+        timeline = self.at.session_state["metrics_timeline"] if "metrics_timeline" in self.at.session_state else ()
+        return {id(event): event for event in list(timeline) if event["name"].startswith("llm ")}
+
+    def button(self, label):
+        for button in self.at.button:
+            if button.label == label:
+                return button
+        raise LookupError(f"no '{label}' button on the page")
+
+    def act(self, name, prepare=None):
+        before = self._llm_events()
+        started = time.perf_counter()
+        error = None
+        try:
+            if prepare is not None:
+                prepare(self.at)
+            self.at.run()
+            if self.at.exception:
+                error = self.at.exception[0].value
+            elif self.at.error:
+                error = self.at.error[0].value
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finished = time.perf_counter()
+        new_events = [event for key, event in self._llm_events().items() if key not in before]
+        self.actions.append({
+            "action": name,
+            "seconds": finished - started,
+            "upstream_calls": sum(1 for event in new_events if event.get("outcome") == "upstream"),
+            "llm_calls": len(new_events),
+            "error": error,
+        })
+        return error is None
+
+    def memory_bytes(self):
+        return sum(deep_sizeof(value) for key, value in self.at.session_state.items() if key != "metrics_timeline")
+
+
+def run_session(index, script_cache, cv=None, timeout=60.0, retakes=1):
+    session = Session(index, timeout, script_cache)
+    if not session.act("load"):
+        return session
+    if cv is not None and index % 2 == 1:
+        # Odd sessions start from a CV upload, even ones from the manual form
+        def attach(at):
+            at.session_state["_bench_cv"] = cv
+        if not session.act("upload_cv", attach):
+            return session
+    else:
+        def fill_form(at):
+            at.text_input(key="skills_input").input("Python, SQL, Data Analysis")
+            at.text_input(key="interests_input").input("Data engineering, machine learning")
+            session.button("Get Career Advice").click()
+        if not session.act("career_advice", fill_form):
+            return session
+    if not session.act("enhance_skill", lambda at: session.button("Enhance Skill").click()):
+        return session
+    for attempt in range(retakes + 1):
+        if attempt:
+            if not session.act("retake_test", lambda at: session.button("Retake Test for This Skill").click()):
+                return session
+        if not session.act("take_test", lambda at: session.button("Take Test").click()):
+            return session
+
+        def answer(at):
+            for radio in at.radio:
+                radio.set_value(radio.options[attempt % len(radio.options)])
+            session.button("Submit Test").click()
+        if not session.act("submit_test", answer):
+            return session
+    return session
+
+
+def summarize(sessions, mock_stats, elapsed, heap_delta=None):
+    flows = {}
+    for session in sessions:
+        for action in session.actions:
+            flows.setdefault(action["action"], []).append(action)
+    report = {"sessions": len(sessions), "elapsed_seconds": round(elapsed, 2), "flows": {}}
+    for name, actions in flows.items():
+        seconds = [a["seconds"] for a in actions]
+        report["flows"][name] = {
+            "count": len(actions),
+            "errors": sum(1 for a in actions if a["error"]),
+            "p50_seconds": round(percentile(seconds, 0.50), 4),
+            "p95_seconds": round(percentile(seconds, 0.95), 4),
+            "p99_seconds": round(percentile(seconds, 0.99), 4),
+            "upstream_calls_per_action": round(sum(a["upstream_calls"] for a in actions) / len(actions), 3),
+            "llm_calls_per_action": round(sum(a["llm_calls"] for a in actions) / len(actions), 3),
+        }
+    session_memory = [session.memory_bytes() for session in sessions]
+    report["memory"] = {
+        "session_state_bytes_mean": int(sum(session_memory) / len(session_memory)) if session_memory else 0,
+        "session_state_bytes_max": max(session_memory, default=0),
+    }
+    artifact_store = registry.get("artifact_store")  # Generated texts shared by all sessions (advisor.artifact_store)
+    if artifact_store is not None:
+        report["memory"]["artifact_store"] = artifact_store.stats()
+    if heap_delta is not None and sessions:
+        report["memory"]["python_heap_bytes_per_session"] = int(heap_delta / len(sessions))
+    try:
+        import resource
+        report["memory"]["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    except ImportError:  # Windows
+        pass
+    report["upstream"] = mock_stats
+    report["errors"] = sorted({a["error"] for s in sessions for a in s.actions if a["error"]})[:10]
+    return report
+
+
+def compare(report, baseline, tolerance):
+    # Regressions: p95 slower, or more upstream calls per action, than the baseline allows
+    problems = []
+    for name, flow in report["flows"].items():
+        old = baseline.get("flows", {}).get(name)
+        if not old:
+            continue
+        if flow["p95_seconds"] > old["p95_seconds"] * (1 + tolerance) + 0.01:
+            problems.append(f"{name}: p95 {flow['p95_seconds']:.3f}s vs baseline {old['p95_seconds']:.3f}s")
+        if flow["upstream_calls_per_action"] > old["upstream_calls_per_action"] + 1e-9:
+            problems.append(
+                f"{name}: {flow['upstream_calls_per_action']} upstream calls/action vs baseline {old['upstream_calls_per_action']}"
+            )
+        if flow["errors"] > old["errors"]:
+            problems.append(f"{name}: {flow['errors']} errors vs baseline {old['errors']}")
+    return problems
+
+
+def print_report(report):
+    print(f"{report['sessions']} sessions in {report['elapsed_seconds']}s")
+    print(f"{'flow':<15}{'count':>7}{'err':>5}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}{'upstream/act':>14}")
+    for name, flow in report["flows"].items():
+        print(
+            f"{name:<15}{flow['count']:>7}{flow['errors']:>5}{flow['p50_seconds']:>9.3f}{flow['p95_seconds']:>9.3f}"
+            f"{flow['p99_seconds']:>9.3f}{flow['upstream_calls_per_action']:>14.2f}"
+        )
+    memory = report["memory"]
+    print(
+        f"session_state: mean {memory['session_state_bytes_mean'] / 1024:.1f} KiB, max {memory['session_state_bytes_max'] / 1024:.1f} KiB"
+        + (f"; heap per session {memory['python_heap_bytes_per_session'] / 1024:.1f} KiB" if "python_heap_bytes_per_session" in memory else "")
+        + (f"; peak RSS {memory['peak_rss_mb']} MiB" if "peak_rss_mb" in memory else "")
+    )
+    if "artifact_store" in memory:
+        store = memory["artifact_store"]
+        print(
+            f"artifact store: {store['bytes'] / 1024:.1f} KiB in {store['entries']} texts, "
+            f"{store['referenced_bytes'] / 1024:.1f} KiB referenced by sessions ({store['saved_bytes'] / 1024:.1f} KiB saved by sharing)"
+        )
+    upstream = report["upstream"]
+    print(
+        f"upstream: {upstream['requests']} requests ({upstream['rate_limited']} answered 429), "
+        f"peak concurrency {upstream['peak_concurrent']}, by kind {upstream['by_kind']}"
+    )
+    for error in report["errors"]:
+        print(f"error: {error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the app flows against a local mock Groq API.")
+    parser.add_argument("--sessions", type=int, default=10, help="Concurrent simulated sessions")
+    parser.add_argument("--retakes", type=int, default=1, help="Test retakes per session")
+    parser.add_argument("--cv", help="PDF/DOCX uploaded by every other session (otherwise all use the manual form)")
+    parser.add_argument("--latency", type=float, default=0.2, help="Mock seconds before the first byte")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--chunk-delay", type=float, default=0.002, help="Mock seconds between stream chunks")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Mock answers every Nth request with 429")
+    parser.add_argument("--malformed-rate", type=float, default=0.1, help="Share of invalid JSON-mode test questions")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds one script run may take")
+    parser.add_argument("--trace-memory", action="store_true", help="Measure Python heap growth per session (slow)")
+    parser.add_argument("--workdir", help="Directory for caches and stores (default: a fresh temporary one)")
+    parser.add_argument("--json", help="Write the report here")
+    parser.add_argument("--baseline", help="Earlier --json report; exit 1 if this run regresses against it")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p95 slowdown against the baseline")
+    args = parser.parse_args(argv)
+    problem = streamlit_version_problem()
+    if problem:
+        parser.error(problem)
+
+    mock = MockGroqServer(
+        latency=args.latency, jitter=args.jitter, chunk_delay=args.chunk_delay,
+        rate_limit_every=args.rate_limit_every, malformed_rate=args.malformed_rate, seed=0,
+    ).start()
+    workdir = args.workdir or tempfile.mkdtemp(prefix="advisor-bench-")
+    # Read by app.py when the shared resources are first created; a fresh workdir means cold caches
+    os.environ.update({
+        "GROQ_BASE_URL": mock.base_url,
+        "LLM_CACHE_PATH": os.path.join(workdir, "llm_cache.sqlite"),
+        "QUESTION_BANK_PATH": os.path.join(workdir, "question_bank.sqlite"),
+        "STRATEGY_STORE_PATH": os.path.join(workdir, "strategies.sqlite"),
+        "PROFILE_STORE_PATH": os.path.join(workdir, "profiles.sqlite"),
+    })
+    os.environ.setdefault("GROQ_REQUESTS_PER_MINUTE", "100000")
+    os.environ.setdefault("GROQ_TOKENS_PER_MINUTE", "100000000")
+    install_secrets({"GROQ_API_API_KEY": "mock"})
+    install_upload_hook()
+    cv = None
+    if args.cv:
+        with open(args.cv, "rb") as f:
+            cv = (os.path.basename(args.cv), f.read())
+
+    if args.trace_memory:
+        tracemalloc.start()
+        heap_before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    sessions = []
+    lock = threading.Lock()
+
+    with shared_app_runtime() as script_cache, ThreadPoolExecutor(max_workers=args.sessions) as executor:
+        def worker(index):
+            session = run_session(index, script_cache, cv=cv, timeout=args.timeout, retakes=args.retakes)
+            with lock:
+                sessions.append(session)
+
+        list(executor.map(worker, range(args.sessions)))
+    elapsed = time.perf_counter() - started
+    heap_delta = None
+    if args.trace_memory:
+        heap_delta = tracemalloc.get_traced_memory()[0] - heap_before
+        tracemalloc.stop()
+    mock.stop()
+
+    report = summarize(sessions, mock.stats(), elapsed, heap_delta)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            problems = compare(report, json.load(f), args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
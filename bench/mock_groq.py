@@ -0,0 +1,285 @@
+# Local stand-in for the Groq (OpenAI-compatible) chat completions endpoint, for load tests and offline runs:
+#   python -m bench.mock_groq --port 8765 --latency 0.3 --rate-limit-every 20
+#   GROQ_BASE_URL=http://127.0.0.1:8765 streamlit run app.py
+# Responses are generated from the prompt (career paths, CV analysis, skills, guides, tests, strategies), so
+# every flow of the app works against it. Latency, streaming speed, 429s and malformed tests are configurable.
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CAREER_TEXT = """1. **Data Engineer**
+- Description: Builds and maintains data pipelines with Python, SQL and Apache Spark, and deploys them on AWS with Docker.
+- Required Certifications: AWS Certified Solutions Architect, Google Professional Data Engineer
+- Average Salary Range: $95,000 - $140,000
+- Growth Outlook: Strong demand as companies centralise their data.
+
+2. **Machine Learning Engineer**
+- Description: Trains and ships machine learning models with Python, TensorFlow and PyTorch, with CI/CD for models.
+- Required Certifications: TensorFlow Developer Certificate
+- Average Salary Range: $110,000 - $160,000
+- Growth Outlook: Among the fastest growing roles in tech.
+
+3. **Cloud Engineer**
+- Description: Designs cloud infrastructure with Kubernetes, Terraform and Linux on Microsoft Azure or AWS.
+- Required Certifications: Certified Kubernetes Administrator, Microsoft Certified: Azure Administrator
+- Average Salary Range: $100,000 - $150,000
+- Growth Outlook: Steady growth with cloud adoption."""
+
+GUIDE_TEXT = """### Learning path
+1. **Fundamentals** - core concepts, syntax and vocabulary (2 weeks).
+2. **Hands-on practice** - small projects and guided exercises (4 weeks).
+3. **Real-world project** - build and publish a portfolio project (4 weeks).
+
+### Resources
+- Official documentation and tutorials
+- An interactive online course
+- Community forums and study groups
+
+### Tips
+Practice daily, review mistakes and explain concepts to others."""
+
+STRATEGY_TEXT = """### Strengths
+You answered the core questions correctly; build on that foundation.
+
+### Focus areas
+1. Revisit the topics you missed and redo the exercises.
+2. Complete one small project that uses them end to end.
+3. Retake the assessment in two weeks.
+
+### Weekly plan
+- 3 hours of guided study
+- 2 hours of project work
+- 1 hour of review"""
+
+
+def _estimate_tokens(text):
+    return max(1, len(text) // 4)
+
+
+def _question(skill, malformed=False):
+    item = {
+        "question": f"Which statement about {skill} is correct? ({uuid.uuid4().hex[:10]})",
+        "options": {"A": "The first statement", "B": "The second statement", "C": "The third statement", "D": "The fourth statement"},
+        "answer": random.choice("ABCD"),
+    }
+    if malformed:
+        # The failure modes the JSON parser has to repair: a bad answer letter or a missing option
+        if random.random() < 0.5:
+            item["answer"] = "E"
+        else:
+            del item["options"]["D"]
+    return item
+
+
+class MockGroqServer:
+    """Threaded HTTP server answering POST /openai/v1/chat/completions (and /v1/chat/completions).
+
+    - latency: seconds before the response (or the first stream chunk), plus up to `jitter` more
+    - chunk_delay: seconds between stream chunks
+    - rate_limit_every: answer every Nth request with 429 and a Retry-After header (0 = never)
+    - malformed_rate: share of generated test questions that fail validation
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.05, jitter=0.0, chunk_delay=0.002,
+                 rate_limit_every=0, retry_after=0.1, malformed_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.chunk_delay = chunk_delay
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.malformed_rate = malformed_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "rate_limited": 0, "streamed": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                       "concurrent": 0, "peak_concurrent": 0}
+        self._by_kind = {}
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-groq", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["by_kind"] = dict(self._by_kind)
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            for key in self._stats:
+                if key != "concurrent":
+                    self._stats[key] = 0
+            self._by_kind.clear()
+
+    # --- Response generation ---
+    def _generate(self, request):
+        # Returns (kind, text) for the last user message
+        content = request["messages"][-1]["content"]
+        if (request.get("response_format") or {}).get("type") == "json_object":
+            count = int((re.search(r"Create (\d+) multiple", content) or [0, 5])[1])
+            skill = (re.search(r"questions about (.+?) at ", content) or [0, "the topic"])[1]
+            questions = [_question(skill, self._random.random() < self.malformed_rate) for _ in range(count)]
+            return "test_json", json.dumps({"questions": questions})
+        match = re.search(r"Create a (\d+)-question multiple choice test about (.+?) at ", content)
+        if match:
+            count, skill = int(match[1]), match[2]
+            questions = [_question(skill) for _ in range(count)]
+            blocks = [
+                f"Question {i}: {q['question']}\n" + "\n".join(f"{letter}) {text}" for letter, text in q["options"].items())
+                for i, q in enumerate(questions, 1)
+            ]
+            answers = [f"Correct Answer {i}: {q['answer']}" for i, q in enumerate(questions, 1)]
+            return "test_text", "\n\n".join(blocks) + "\n\n" + "\n".join(answers)
+        if content.startswith("From the following career analysis"):
+            return "skills", "Python Programming, Data Analysis, SQL"
+        if "learning guide" in content:
+            return "learning_guide", GUIDE_TEXT
+        if content.startswith("Based on a test score"):
+            return "strategy", STRATEGY_TEXT
+        if content.startswith("Analyze this CV"):
+            return "cv_analysis", CAREER_TEXT
+        if content.startswith("Update this CV analysis"):
+            return "cv_update", CAREER_TEXT
+        return "career_paths", CAREER_TEXT
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the real API, so the client pool is exercised
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, payload, headers=()):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                if self.path.rstrip("/") not in ("/openai/v1/chat/completions", "/v1/chat/completions"):
+                    self._send_json(404, {"error": {"message": "not found"}})
+                    return
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", "0"))) or b"{}")
+                with server._lock:
+                    server._stats["requests"] += 1
+                    number = server._stats["requests"]
+                    server._stats["concurrent"] += 1
+                    server._stats["peak_concurrent"] = max(server._stats["peak_concurrent"], server._stats["concurrent"])
+                try:
+                    self._respond(request, number)
+                finally:
+                    with server._lock:
+                        server._stats["concurrent"] -= 1
+
+            def _respond(self, request, number):
+                if server.rate_limit_every and number % server.rate_limit_every == 0:
+                    with server._lock:
+                        server._stats["rate_limited"] += 1
+                    self._send_json(
+                        429,
+                        {"error": {"message": "Rate limit reached (mock)", "type": "tokens", "code": "rate_limit_exceeded"}},
+                        headers=[("retry-after", f"{server.retry_after:g}")],
+                    )
+                    return
+                kind, text = server._generate(request)
+                prompt_tokens = sum(_estimate_tokens(m.get("content") or "") for m in request["messages"])
+                completion_tokens = _estimate_tokens(text)
+                usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                         "total_tokens": prompt_tokens + completion_tokens}
+                with server._lock:
+                    server._by_kind[kind] = server._by_kind.get(kind, 0) + 1
+                    server._stats["prompt_tokens"] += prompt_tokens
+                    server._stats["completion_tokens"] += completion_tokens
+                    server._stats["streamed"] += bool(request.get("stream"))
+                time.sleep(server.latency + server._random.uniform(0, server.jitter))
+
+                completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+                model = request.get("model", "mock")
+                created = int(time.time())
+                if not request.get("stream"):
+                    self._send_json(200, {
+                        "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                        "usage": usage,
+                    })
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                def send_event(payload):
+                    data = f"data: {payload}\n\n".encode("utf-8")
+                    self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                    self.wfile.flush()
+
+                pieces = re.findall(r"\S+\s*", text)
+                for index, piece in enumerate(pieces):
+                    chunk = {
+                        "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                        "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+                    }
+                    if index == len(pieces) - 1:
+                        chunk["choices"][0]["finish_reason"] = "stop"
+                        chunk["x_groq"] = {"id": completion_id, "usage": usage}  # Groq reports usage on the last chunk
+                    send_event(json.dumps(chunk))
+                    if server.chunk_delay:
+                        time.sleep(server.chunk_delay)
+                send_event("[DONE]")
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a mock Groq chat completions API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds before the first byte")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Extra random latency, up to this many seconds")
+    parser.add_argument("--chunk-delay", type=float, default=0.01, help="Seconds between stream chunks")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Answer every Nth request with a 429")
+    parser.add_argument("--malformed-rate", type=float, default=0.1, help="Share of invalid JSON-mode test questions")
+    args = parser.parse_args(argv)
+
+    server = MockGroqServer(
+        args.host, args.port, latency=args.latency, jitter=args.jitter, chunk_delay=args.chunk_delay,
+        rate_limit_every=args.rate_limit_every, malformed_rate=args.malformed_rate,
+    )
+    print(f"Mock Groq API on {server.base_url} (set GROQ_BASE_URL to this)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()